@@ -0,0 +1,182 @@
+"""
+Benchmark: sentence encoder backends (torch, onnx, onnx-int8).
+
+Each backend runs in its own subprocess so resident memory reflects only
+that runtime. A worker loads HybridSkillExtractor with the backend, times
+phrase encoding and full extraction over the synthetic corpus, and reports
+the extracted skills and phrase embeddings; the parent checks both against
+the torch backend and exits non-zero if any phrase embedding's cosine
+similarity to torch's falls below --min-cosine.
+
+The first ONNX run exports (and quantizes) the model into the cache dir;
+that step needs torch and sentence-transformers, later runs do not.
+
+Run from the repo root:
+    python benchmarks/bench_encoders.py
+    python benchmarks/bench_encoders.py --backends torch,onnx-int8 --threads 4
+    python benchmarks/bench_encoders.py --model path/to/sentence-transformers-model
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from corpus import generate_corpus
+
+REPEAT = 5
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process"""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def worker(backend: str, model_name: str, n_resumes: int, embeddings_path: str) -> dict:
+    from src.skill_extractor import HybridSkillExtractor
+
+    start = time.perf_counter()
+    extractor = HybridSkillExtractor(model_name, encoder_backend=backend)
+    load_s = time.perf_counter() - start
+
+    resumes = generate_corpus(n_resumes, 0)["resumes"]
+    phrases = []
+    for text in resumes:
+        skills, candidates, _ = extractor._lexical_stage(text.lower())
+        phrases.extend(extractor._semantic_candidates(candidates, skills))
+    phrases = list(dict.fromkeys(phrases))
+
+    encoder = extractor.sbert
+    # Doubles as the warm-up pass
+    np.save(embeddings_path, encoder.encode(phrases, batch_size=64, normalize_embeddings=True))
+    encode_ms = []
+    single_ms = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        encoder.encode(phrases, batch_size=64, normalize_embeddings=True)
+        encode_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        encoder.encode([phrases[0]], normalize_embeddings=True)
+        single_ms.append((time.perf_counter() - start) * 1000)
+
+    # Fresh caches so every pass goes through the encoder
+    extractor.skill_cache.clear()
+    extractor.phrase_embeddings._cache.clear()
+    start = time.perf_counter()
+    skills = extractor.extract_skills_batch(resumes)
+    extract_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "phrases": len(phrases),
+        "encode_ms": round(statistics.median(encode_ms), 1),
+        "single_ms": round(statistics.median(single_ms), 2),
+        "extract_ms": round(extract_ms, 1),
+        "rss_mb": round(peak_rss_mb(), 1),
+        "skills": skills,
+    }
+
+
+def run_worker(backend: str, model_name: str, n_resumes: int, threads: int, embeddings_path: str) -> dict:
+    env = dict(os.environ)
+    if threads:
+        env["ATS_ENCODER_THREADS"] = str(threads)
+    result = subprocess.run(
+        [
+            sys.executable, __file__, "--worker", backend, "--model", model_name,
+            "--resumes", str(n_resumes), "--embeddings", embeddings_path
+        ],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return {"backend": backend, "error": lines[-1] if lines else f"exit status {result.returncode}"}
+    # The extractor prints progress; the result is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def agreement(skills: list, reference: list) -> tuple:
+    """(fraction of documents with identical skills, mean Jaccard similarity)"""
+    identical = sum(a == b for a, b in zip(skills, reference))
+    jaccard = [
+        len(set(a) & set(b)) / len(set(a) | set(b)) if a or b else 1.0
+        for a, b in zip(skills, reference)
+    ]
+    return identical / len(reference), statistics.mean(jaccard)
+
+
+def cosine_to(embeddings: np.ndarray, reference: np.ndarray) -> tuple:
+    """(lowest, mean) cosine similarity between matching rows of two normalized matrices"""
+    cosine = np.sum(embeddings * reference, axis=1)
+    return float(cosine.min()), float(cosine.mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8", help="Comma-separated backends")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model name or path")
+    parser.add_argument("--resumes", type=int, default=60, help="Generated resumes in the reference corpus")
+    parser.add_argument("--threads", type=int, default=0, help="Encoder threads (0 = library default)")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="Lowest cosine similarity to torch allowed per phrase")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--embeddings", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.model, args.resumes, args.embeddings)))
+        return
+
+    backends = args.backends.split(",")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {backend: os.path.join(tmp, f"{backend}.npy") for backend in backends}
+        results = [
+            run_worker(backend, args.model, args.resumes, args.threads, paths[backend]) for backend in backends
+        ]
+        embeddings = {r["backend"]: np.load(paths[r["backend"]]) for r in results if "error" not in r}
+    reference = next((r["skills"] for r in results if r["backend"] == "torch" and "skills" in r), None)
+
+    print(f"{args.model}, {args.resumes} resumes, median of {REPEAT} passes")
+    print(
+        f"{'backend':>10} {'load s':>7} {'encode ms':>10} {'1 phrase ms':>12} {'extract ms':>11}"
+        f" {'peak RSS MB':>12} {'identical':>10} {'jaccard':>8} {'min cos':>8} {'mean cos':>9}"
+    )
+    failed = False
+    for result in results:
+        if "error" in result:
+            print(f"{result['backend']:>10}  failed: {result['error']}")
+            failed = True
+            continue
+        identical, jaccard = agreement(result["skills"], reference) if reference else (float("nan"),) * 2
+        if "torch" in embeddings:
+            min_cos, mean_cos = cosine_to(embeddings[result["backend"]], embeddings["torch"])
+            failed = failed or min_cos < args.min_cosine
+        else:
+            min_cos, mean_cos = float("nan"), float("nan")
+        print(
+            f"{result['backend']:>10} {result['load_s']:>7.2f} {result['encode_ms']:>10.1f}"
+            f" {result['single_ms']:>12.2f} {result['extract_ms']:>11.1f} {result['rss_mb']:>12.1f}"
+            f" {identical:>10.1%} {jaccard:>8.3f} {min_cos:>8.5f} {mean_cos:>9.5f}"
+        )
+    print(f"Encode column: {results[0].get('phrases', '?')} unique candidate phrases, batch size 64")
+    print(f"Cosine columns: phrase embeddings against torch's (lowest allowed {args.min_cosine})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
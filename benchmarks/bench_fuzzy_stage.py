@@ -0,0 +1,96 @@
+"""
+Benchmark: fuzzy matching stage (Method 3) of HybridSkillExtractor.
+Compares the old nested fuzz.ratio loop with FuzzySkillMatcher on resumes
+of increasing length and checks both return the same skills.
+
+Run from the repo root:
+    python benchmarks/bench_fuzzy_stage.py
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rapidfuzz import fuzz
+
+from src.skill_extractor import HybridSkillExtractor
+from src.skill_matcher import FuzzySkillMatcher
+
+FILLER = (
+    "designed built maintained scalable services team led delivered improved "
+    "performance reduced latency customers production pipelines reporting "
+    "stakeholders cross functional ownership mentoring onboarding documentation"
+).split()
+
+
+def make_resume(skills: list, n_words: int, seed: int = 0) -> str:
+    """Generate a synthetic resume mixing filler words, skills and typos"""
+    rng = random.Random(seed)
+    words = []
+    while len(words) < n_words:
+        roll = rng.random()
+        if roll < 0.15:
+            skill = rng.choice(skills)
+            if len(skill) > 4 and rng.random() < 0.3:
+                i = rng.randrange(len(skill))
+                skill = skill[:i] + skill[i + 1:]  # typo
+            words.extend(skill.split())
+        else:
+            words.append(rng.choice(FILLER))
+    return " ".join(words)
+
+
+def ngram_candidates(text: str) -> list:
+    """Same 1-3 word candidates as extract_skills"""
+    words = re.findall(r'\b\w+(?:\.\w+)?\b', text.lower())
+    candidates = []
+    for i in range(len(words)):
+        candidates.append(words[i])
+        if i < len(words) - 1:
+            candidates.append(f"{words[i]} {words[i+1]}")
+        if i < len(words) - 2:
+            candidates.append(f"{words[i]} {words[i+1]} {words[i+2]}")
+    return candidates
+
+
+def legacy_fuzzy(candidates: list, skill_database: list) -> set:
+    """The original nested loop"""
+    detected = set()
+    for candidate in set(candidates):
+        for skill in skill_database:
+            if fuzz.ratio(candidate, skill) >= 90:
+                detected.add(skill)
+                break
+    return detected
+
+
+def main():
+    # The skill database does not need the SBERT model
+    skill_database = HybridSkillExtractor.__new__(HybridSkillExtractor)._get_skill_database()
+    matcher = FuzzySkillMatcher(skill_database, threshold=90)
+
+    print(f"{'words':>7} {'candidates':>11} {'legacy (s)':>11} {'bulk (s)':>9} {'speedup':>8}")
+    for n_words in (300, 800, 1600, 3200):
+        candidates = ngram_candidates(make_resume(skill_database, n_words, seed=n_words))
+
+        start = time.perf_counter()
+        expected = legacy_fuzzy(candidates, skill_database)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = matcher.match(candidates)
+        bulk_time = time.perf_counter() - start
+
+        assert result == expected, f"mismatch: {sorted(result ^ expected)}"
+        print(
+            f"{n_words:>7} {len(set(candidates)):>11} {legacy_time:>11.3f} "
+            f"{bulk_time:>9.3f} {legacy_time / bulk_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark: DescriptionScraper HTML backends over the saved fixture pages.
+Checks every backend extracts the same text as html.parser, then times them.
+
+Run from the repo root:
+    python benchmarks/bench_html_backends.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.jd_scraper import DescriptionScraper
+from src.html_backends import BACKENDS
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "jd_pages"
+REPEAT = 20
+
+
+def main():
+    pages = {path.name: path.read_text(encoding="utf-8") for path in sorted(FIXTURES.glob("*.html"))}
+    scrapers = {name: DescriptionScraper(parser_backend=name) for name in BACKENDS}
+    reference = scrapers["html.parser"]
+
+    timings = {name: 0.0 for name in scrapers}
+    for page_name, html in pages.items():
+        expected = reference.extract_text(html)
+        for name, scraper in scrapers.items():
+            assert scraper.extract_text(html) == expected, f"{name} differs on {page_name}"
+
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                scraper.extract_text(html)
+            timings[name] += time.perf_counter() - start
+
+    n_parses = len(pages) * REPEAT
+    baseline = timings["html.parser"]
+    print(f"{len(pages)} fixture pages x {REPEAT} repeats, identical text from every backend")
+    print(f"{'backend':>12} {'ms/page':>9} {'speedup':>8}")
+    for name, total in timings.items():
+        print(f"{name:>12} {total / n_parses * 1000:>9.2f} {baseline / total:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
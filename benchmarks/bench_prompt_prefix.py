@@ -0,0 +1,110 @@
+"""
+Benchmark: prompt evaluation with and without reusing the shared prompt prefix.
+
+Generates every tone x message type variant for one resume/JD pair through
+EmailGenerator.agenerate_variants twice: once with templated full prompts
+(reuse_prefix=False) and the model unloaded before every request, so each
+prompt is evaluated from scratch; and once with prefix reuse from a cold
+start, where the shared prefix is primed and every variant is sent as a raw
+prompt starting with the same tokens, so Ollama's prompt cache skips them.
+Reports the prompt_eval_count / prompt_eval_duration Ollama returns for each
+request, including the priming request (model load time is not included).
+
+Needs a running Ollama server with the model pulled. Run from the repo root:
+    python benchmarks/bench_prompt_prefix.py [model] [ollama_url]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiohttp
+
+from src.email_genarator import EmailGenerator
+
+# Only prompt evaluation is being measured; keep generation short
+NUM_PREDICT = 16
+
+RESUME = """Backend engineer with 5 years of experience building Python services.
+Built FastAPI and Django REST APIs on AWS, containerised with Docker and deployed
+to Kubernetes through GitHub Actions CI/CD. Migrated a PostgreSQL monolith to
+microservices, cutting p95 latency by 40%. Mentored three junior engineers and
+ran the team's agile ceremonies. Side projects in NLP with PyTorch and scikit-learn."""
+
+JD = """We are hiring a Senior Backend Engineer to join Acme Analytics. You will design
+and own Python microservices running on AWS and Kubernetes, build REST APIs with
+FastAPI, and improve our CI/CD pipelines. Requirements: 4+ years of Python, strong
+SQL and PostgreSQL, Docker, experience with distributed systems, and a habit of
+writing well-tested code. Nice to have: machine learning or NLP exposure."""
+
+
+async def run(generator: EmailGenerator, reuse_prefix: bool) -> list:
+    """One row of (label, prompt tokens, prompt eval ms) per request sent to Ollama"""
+    generator.reuse_prefix = reuse_prefix
+    rows = []
+    generate = generator.client.generate
+
+    async def unload():
+        # An empty prompt with keep_alive 0 unloads the model, dropping its prompt cache
+        await generate({"model": generator.model, "prompt": "", "keep_alive": 0})
+
+    async def recording_generate(payload: dict) -> dict:
+        if not reuse_prefix:
+            await unload()
+        priming = payload["options"]["num_predict"] == 1
+        payload["options"]["num_predict"] = min(payload["options"]["num_predict"], NUM_PREDICT)
+        result = await generate(payload)
+        rows.append((
+            "prime prefix" if priming else "variant",
+            result.get("prompt_eval_count", 0),
+            result.get("prompt_eval_duration", 0) / 1e6,
+        ))
+        return result
+
+    await unload()
+    generator.client.generate = recording_generate
+    try:
+        # One at a time, so each request can reuse what the previous one cached
+        async for _ in generator.agenerate_variants(RESUME, JD, concurrency=1, use_cache=False):
+            pass
+    finally:
+        generator.client.generate = generate
+    return rows
+
+
+def report(title: str, rows: list):
+    print(f"\n{title}")
+    print(f"{'request':>14} {'prompt tokens':>14} {'prompt eval ms':>15}")
+    for label, count, ms in rows:
+        print(f"{label:>14} {count:>14} {ms:>15.1f}")
+    print(f"{'total':>14} {sum(r[1] for r in rows):>14} {sum(r[2] for r in rows):>15.1f}")
+
+
+async def main():
+    model = sys.argv[1] if len(sys.argv) > 1 else "llama3.2"
+    url = sys.argv[2] if len(sys.argv) > 2 else "http://localhost:11434"
+    generator = EmailGenerator(model_name=model, ollama_url=url)
+
+    try:
+        full = await run(generator, reuse_prefix=False)
+        reused = await run(generator, reuse_prefix=True)
+    except aiohttp.ClientConnectionError:
+        print(f"Cannot connect to Ollama at {url}; start it with 'ollama serve'")
+        return
+    finally:
+        await generator.client.close()
+
+    print(f"model={model}, {len(full)} variants, num_predict={NUM_PREDICT}")
+    report("Full prompt per request, nothing cached", full)
+    report("Primed prefix + raw prompts", reused)
+
+    full_ms = sum(r[2] for r in full)
+    reused_ms = sum(r[2] for r in reused)
+    if reused_ms:
+        print(f"\nprompt eval time: {full_ms:.1f} ms -> {reused_ms:.1f} ms ({full_ms / reused_ms:.1f}x less)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
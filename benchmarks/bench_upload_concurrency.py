@@ -0,0 +1,120 @@
+"""
+Benchmark: event-loop responsiveness while large PDFs are being parsed.
+
+Starts a local server with two upload endpoints, one parsing inline on the
+event loop (the old behaviour) and one awaiting PdfParsePool, and measures
+the latency of a trivial /ping endpoint while concurrent uploads run.
+
+Run from the repo root:
+    python benchmarks/bench_upload_concurrency.py
+"""
+
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import requests
+import uvicorn
+from fastapi import FastAPI, UploadFile, File
+from PyPDF2 import PdfReader, PdfWriter
+
+from src.resume_parser import PdfParser, PdfParsePool
+
+UPLOADS = 6
+PAGES = 120
+
+
+def make_big_pdf(pages: int) -> str:
+    """Repeat the sample resume's pages into one large PDF"""
+    reader = PdfReader(str(ROOT / "data" / "resume.pdf"))
+    writer = PdfWriter()
+    while len(writer.pages) < pages:
+        for page in reader.pages:
+            writer.add_page(page)
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def build_app(upload_dir: str) -> FastAPI:
+    app = FastAPI()
+    parser = PdfParser()
+    pool = PdfParsePool(max_workers=2, timeout=600, max_pages=PAGES)
+
+    def save(file: UploadFile) -> str:
+        path = os.path.join(upload_dir, f"{time.monotonic_ns()}.pdf")
+        with open(path, "wb") as buffer:
+            buffer.write(file.file.read())
+        return path
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/upload_inline")
+    async def upload_inline(file: UploadFile = File(...)):
+        return {"chars": len(parser.Resume_parse(save(file)))}
+
+    @app.post("/upload_pool")
+    async def upload_pool(file: UploadFile = File(...)):
+        return {"chars": len(await pool.parse(save(file)))}
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure(base_url: str, endpoint: str, pdf_path: str) -> list:
+    """Fire concurrent uploads and sample /ping latency until they finish"""
+    def upload():
+        with open(pdf_path, "rb") as f:
+            requests.post(f"{base_url}{endpoint}", files={"file": ("big.pdf", f)}, timeout=600)
+
+    latencies = []
+    with ThreadPoolExecutor(UPLOADS) as executor:
+        futures = [executor.submit(upload) for _ in range(UPLOADS)]
+        time.sleep(0.2)
+        while not all(f.done() for f in futures):
+            start = time.perf_counter()
+            requests.get(f"{base_url}/ping", timeout=600)
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.05)
+    return latencies
+
+
+def main():
+    pdf_path = make_big_pdf(PAGES)
+    upload_dir = tempfile.mkdtemp()
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(build_app(upload_dir), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{port}"
+    print(f"{UPLOADS} concurrent uploads of a {PAGES}-page PDF")
+    print(f"{'mode':>8} {'pings':>6} {'p50 ms':>8} {'max ms':>8}")
+    for mode, endpoint in (("inline", "/upload_inline"), ("pool", "/upload_pool")):
+        latencies = measure(base_url, endpoint, pdf_path)
+        print(f"{mode:>8} {len(latencies):>6} {statistics.median(latencies):>8.1f} {max(latencies):>8.1f}")
+
+    server.should_exit = True
+    os.remove(pdf_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: VectorStore top-k search over 100k resume-sized embeddings.
+
+Uses synthetic clustered unit vectors with the all-MiniLM-L6-v2 dimension,
+so no model is needed. Reports exact (blocked) and IVF search latency for
+float32 and int8 storage, with IVF recall against brute force.
+
+Run from the repo root:
+    python benchmarks/bench_vector_store.py
+"""
+
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from src.vector_store import VectorStore
+
+N_RESUMES = 100_000
+DIM = 384
+K = 10
+N_QUERIES = 20
+N_PROBE = 16
+
+
+def make_embeddings(rng) -> np.ndarray:
+    centers = rng.normal(size=(200, DIM))
+    vectors = centers[rng.integers(0, len(centers), N_RESUMES)] + rng.normal(scale=0.8, size=(N_RESUMES, DIM))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def timed_search(store: VectorStore, queries: np.ndarray, n_probe: int = None) -> tuple:
+    store.search(queries[0], K, n_probe)  # warm up
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(store.search(query, K, n_probe))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies), results
+
+
+def recall(results: list, truth: list) -> float:
+    found = [len({r["resume_id"] for r in res} & expected) for res, expected in zip(results, truth)]
+    return sum(found) / (K * len(truth))
+
+
+def main():
+    rng = np.random.default_rng(0)
+    embeddings = make_embeddings(rng)
+    ids = [f"resume-{i}" for i in range(N_RESUMES)]
+
+    queries = embeddings[rng.choice(N_RESUMES, N_QUERIES)] + rng.normal(scale=0.05, size=(N_QUERIES, DIM))
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+    truth = [{ids[i] for i in np.argsort(-(embeddings @ q))[:K]} for q in queries]
+
+    print(f"{N_RESUMES} resumes x {DIM} dims, top-{K}, median of {N_QUERIES} queries")
+    print(f"{'dtype':>8} {'MB':>7} {'exact ms':>9} {'recall':>7} {'ivf ms':>7} {'recall':>7}")
+    for dtype in VectorStore.DTYPES:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = VectorStore(DIM, tmp, dtype)
+            store.add(ids, embeddings)
+
+            exact_ms, exact = timed_search(store, queries)
+            store.build_ivf()
+            ivf_ms, approx = timed_search(store, queries, N_PROBE)
+
+            size_mb = store._vectors[:len(store.ids)].nbytes / 1e6
+            print(
+                f"{dtype:>8} {size_mb:>7.1f} {exact_ms:>9.1f} {recall(exact, truth):>7.2f}"
+                f" {ivf_ms:>7.1f} {recall(approx, truth):>7.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Deterministic synthetic resumes and job descriptions for the benchmarks.
+
+Documents mix skills (including aliases, odd casing and near-miss typos for
+the fuzzy stage) with filler prose, and come in short/medium/long lengths so
+stage timings cover the range seen in practice.
+"""
+
+import random
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "SQL",
+    "React", "React.js", "Node.js", "Vue.js", "Angular", "Next.js", "Express",
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "k8s", "Terraform", "Ansible",
+    "PostgreSQL", "MySQL", "MongoDB", "Redis", "Cassandra", "DynamoDB",
+    "TensorFlow", "PyTorch", "Keras", "scikit-learn", "Pandas", "NumPy", "XGBoost",
+    "Flask", "Django", "FastAPI", "Spring Boot", "Rails", "ASP.NET",
+    "Git", "GitHub Actions", "Jenkins", "CircleCI", "REST API", "GraphQL", "gRPC",
+    "microservices", "serverless", "machine learning", "deep learning", "NLP",
+    "computer vision", "data analysis", "data engineering", "Apache Spark", "Kafka",
+    "Airflow", "Tableau", "Power BI", "Excel", "Agile", "Scrum", "CI/CD", "Linux",
+]
+
+# Near misses the fuzzy matcher should still catch
+TYPOS = ["Pyhton", "Kubernets", "Postgresql", "Tensorflow", "Javscript", "Djnago", "Terraform"]
+
+FILLER = [
+    "Led a cross-functional team to deliver the project ahead of schedule.",
+    "Collaborated with product managers and designers on customer facing features.",
+    "Improved service latency and reliability through careful profiling.",
+    "Mentored junior engineers and ran weekly knowledge sharing sessions.",
+    "Owned the on-call rotation and wrote runbooks for common incidents.",
+    "Designed data models and reviewed pull requests across several teams.",
+    "Worked closely with stakeholders to gather and refine requirements.",
+    "Automated manual reporting, saving the operations team hours every week.",
+    "Presented quarterly results to leadership and proposed the next roadmap.",
+    "Responsible for documentation, testing and release coordination.",
+]
+
+JD_FILLER = [
+    "We are hiring a Senior Software Engineer to join our platform team.",
+    "You will design, build and operate services used by millions of customers.",
+    "The ideal candidate communicates clearly and enjoys ownership.",
+    "We offer flexible hours, remote work and a generous learning budget.",
+    "Requirements include experience with distributed systems and testing.",
+    "Nice to have: open source contributions and startup experience.",
+]
+
+# (name, number of sentences) per document length bucket
+LENGTHS = [("short", 6), ("medium", 25), ("long", 80)]
+
+
+def _document(rng: random.Random, n_sentences: int, filler: list, skills_per_sentence: float) -> str:
+    sentences = []
+    for _ in range(n_sentences):
+        sentence = rng.choice(filler)
+        n_skills = int(skills_per_sentence + rng.random())
+        if n_skills:
+            picks = rng.sample(SKILLS, n_skills)
+            if rng.random() < 0.1:
+                picks[0] = rng.choice(TYPOS)
+            sentence += " Used " + ", ".join(picks) + "."
+        sentences.append(sentence)
+    return " ".join(sentences)
+
+
+def generate_corpus(n_resumes: int = 60, n_jds: int = 12, seed: int = 0) -> dict:
+    """
+    Returns:
+        {"resumes": [...], "jds": [...]}, evenly spread over short/medium/long
+    """
+    rng = random.Random(seed)
+    resumes = [
+        _document(rng, LENGTHS[i % len(LENGTHS)][1], FILLER, skills_per_sentence=1.2)
+        for i in range(n_resumes)
+    ]
+    jds = [
+        _document(rng, max(4, LENGTHS[i % len(LENGTHS)][1] // 3), JD_FILLER, skills_per_sentence=1.5)
+        for i in range(n_jds)
+    ]
+    return {"resumes": resumes, "jds": jds}
@@ -0,0 +1,345 @@
+"""
+Offline benchmark suite for the scoring, extraction, parsing and scraping hot paths.
+
+Every stage runs over a generated corpus, the PDFs in data/ or the saved HTML
+fixtures; nothing touches the network (the SBERT model must already be in the
+local cache). Each stage reports median/min/mean wall time over several
+repeats plus peak traced memory from one extra tracemalloc run. Results are
+written as JSON and can be compared against a stored baseline.
+
+Run from the repo root:
+    python benchmarks/run.py                                  # all stages
+    python benchmarks/run.py --stages lexical,pdf_parse       # a subset
+    python benchmarks/run.py --save-baseline benchmarks/results/baseline.json
+    python benchmarks/run.py --baseline benchmarks/results/baseline.json --threshold 0.15
+
+Exits with status 1 when a stage regresses past its threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from corpus import generate_corpus
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "jd_pages"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+STAGES = {}
+
+
+def stage(name: str):
+    """
+    Register a stage setup function.
+
+    Setup receives the shared context and returns (run, n_items), where run()
+    performs one full pass of the work being measured.
+    """
+    def register(setup):
+        STAGES[name] = setup
+        return setup
+    return register
+
+
+# ------------------ Shared heavy objects ------------------
+def _scorer_pro(ctx: dict):
+    if "scorer_pro" not in ctx:
+        from src.scorer import ResumeScorerPro
+        ctx["scorer_pro"] = ResumeScorerPro()
+    return ctx["scorer_pro"]
+
+
+def _keyword_scorer(ctx: dict):
+    if "keyword_scorer" not in ctx:
+        from src.scorer import Resume_scorer
+        ctx["keyword_scorer"] = Resume_scorer()
+    return ctx["keyword_scorer"]
+
+
+# ------------------ Stages ------------------
+@stage("lexical")
+def lexical_stage(ctx):
+    """HybridSkillExtractor methods 1-3 (aliases, dictionary, fuzzy) without the semantic stage"""
+    extractor = _scorer_pro(ctx).extractor
+    texts = [t.lower() for t in ctx["corpus"]["resumes"]]
+    return (lambda: [extractor._lexical_stage(t) for t in texts]), len(texts)
+
+
+@stage("extract_skills")
+def extract_skills_stage(ctx):
+    """HybridSkillExtractor.extract_skills one resume at a time (result cache cleared each pass)"""
+    extractor = _scorer_pro(ctx).extractor
+    resumes = ctx["corpus"]["resumes"]
+
+    def run():
+        extractor.skill_cache.clear()
+        return [extractor.extract_skills(text) for text in resumes]
+    return run, len(resumes)
+
+
+@stage("extract_skills_batch")
+def extract_skills_batch_stage(ctx):
+    """HybridSkillExtractor.extract_skills_batch over all resumes (result cache cleared each pass)"""
+    extractor = _scorer_pro(ctx).extractor
+    resumes = ctx["corpus"]["resumes"]
+
+    def run():
+        extractor.skill_cache.clear()
+        return extractor.extract_skills_batch(resumes)
+    return run, len(resumes)
+
+
+def _extract_mode_stage(mode: str):
+    def setup(ctx):
+        extractor = _scorer_pro(ctx).extractor
+        resumes = ctx["corpus"]["resumes"]
+
+        def run():
+            extractor.skill_cache.clear()
+            return extractor.extract_skills_batch(resumes, mode=mode)
+        return run, len(resumes)
+    return setup
+
+
+stage("extract_skills_batch[fast]")(_extract_mode_stage("fast"))
+stage("extract_skills_batch[balanced]")(_extract_mode_stage("balanced"))
+
+
+@stage("score_resume_batch")
+def score_resume_batch_stage(ctx):
+    """ResumeScorerPro.resume_skill_score_batch of every resume against each JD"""
+    scorer = _scorer_pro(ctx)
+    resumes, jds = ctx["corpus"]["resumes"], ctx["corpus"]["jds"]
+
+    def run():
+        scorer.extractor.skill_cache.clear()
+        return [list(scorer.resume_skill_score_batch(resumes, jd)) for jd in jds]
+    return run, len(resumes) * len(jds)
+
+
+@stage("keyword_score")
+def keyword_score_stage(ctx):
+    """Resume_scorer.compute_score_batch (corpus IDF) of every resume against each JD"""
+    scorer = _keyword_scorer(ctx)
+    resumes, jds = ctx["corpus"]["resumes"], ctx["corpus"]["jds"]
+    return (lambda: [scorer.compute_score_batch(resumes, jd) for jd in jds]), len(resumes) * len(jds)
+
+
+@stage("clean_texts")
+def clean_texts_stage(ctx):
+    """Resume_scorer.clean_texts over all resumes and JDs (lemma table warm after the first pass)"""
+    scorer = _keyword_scorer(ctx)
+    texts = ctx["corpus"]["resumes"] + ctx["corpus"]["jds"]
+    return (lambda: scorer.clean_texts(texts)), len(texts)
+
+
+@stage("pdf_parse")
+def pdf_parse_stage(ctx):
+    """PdfParser.Resume_parse over the sample PDFs in data/"""
+    from src.resume_parser import PdfParser
+
+    parser = PdfParser()
+    pdfs = sorted(str(p) for p in (ROOT / "data").glob("*.pdf"))
+    if not pdfs:
+        raise FileNotFoundError("No sample PDFs in data/")
+    return (lambda: [parser.Resume_parse(p) for p in pdfs]), len(pdfs)
+
+
+def _html_stage(backend: str):
+    def setup(ctx):
+        from src.jd_scraper import DescriptionScraper
+
+        scraper = DescriptionScraper(parser_backend=backend)
+        pages = [p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.html"))]
+        return (lambda: [scraper.extract_text(html) for html in pages]), len(pages)
+    return setup
+
+
+stage("html_extract[lxml]")(_html_stage("lxml"))
+stage("html_extract[html.parser]")(_html_stage("html.parser"))
+
+
+# ------------------ Runner ------------------
+def measure(run, n_items: int, repeat: int) -> dict:
+    run()  # warm up caches and lazy imports
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Separate pass: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "items": n_items,
+        "repeat": repeat,
+        "median_ms": round(median, 3),
+        "min_ms": round(min(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "per_item_ms": round(median / n_items, 4) if n_items else None,
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def missing_dependency(e: Exception) -> bool:
+    """True for errors meaning an optional package, model or data file isn't installed"""
+    if isinstance(e, (ImportError, FileNotFoundError)):
+        return True
+    # nltk raises a bare LookupError("Resource ... not found") for missing corpora
+    return type(e) is LookupError and "Resource" in str(e) and "not found" in str(e)
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    threshold: float,
+    memory_threshold: float,
+    overrides: dict,
+    selected: list = None
+) -> list:
+    """
+    Print a comparison table and return the names of regressed stages.
+
+    A stage measured in the baseline that is now skipped or absent counts as
+    regressed, unless selected (the --stages subset) leaves it out.
+    """
+    regressions = []
+    print(f"\n{'stage':>32} {'base ms':>9} {'now ms':>9} {'change':>8} {'mem change':>11}")
+    for name, base in baseline.get("stages", {}).items():
+        if "median_ms" not in base or (selected is not None and name not in selected):
+            continue
+        current = results["stages"].get(name)
+        if current is None or "median_ms" not in current:
+            reason = current["skipped"] if current else "not run"
+            print(f"{name:>32} {base['median_ms']:>9.2f} {'-':>9}  REGRESSION ({reason})")
+            regressions.append(name)
+            continue
+
+        limit = overrides.get(name, threshold)
+        time_change = current["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        mem_change = (
+            current["peak_memory_kb"] / base["peak_memory_kb"] - 1 if base.get("peak_memory_kb") else 0.0
+        )
+        regressed = time_change > limit or mem_change > memory_threshold
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{name:>32} {base['median_ms']:>9.2f} {current['median_ms']:>9.2f}"
+            f" {time_change:>+8.1%} {mem_change:>+11.1%}{flag}"
+        )
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def parse_overrides(values: list) -> dict:
+    overrides = {}
+    for value in values:
+        name, _, limit = value.partition("=")
+        if not limit:
+            raise SystemExit(f"--stage-threshold expects name=fraction, got '{value}'")
+        overrides[name] = float(limit)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", help=f"Comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per stage")
+    parser.add_argument("--resumes", type=int, default=60, help="Generated resumes")
+    parser.add_argument("--jds", type=int, default=12, help="Generated job descriptions")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--output", default=str(RESULTS_DIR / "latest.json"), help="Where to write results")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", help="Also write these results as a baseline to this path")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed median time increase (0.10 = +10%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.20, help="Allowed peak memory increase")
+    parser.add_argument(
+        "--stage-threshold", action="append", default=[], metavar="NAME=FRACTION",
+        help="Per-stage time threshold, e.g. pdf_parse=0.3 (repeatable)"
+    )
+    args = parser.parse_args()
+
+    names = args.stages.split(",") if args.stages else list(STAGES)
+    unknown = [n for n in names if n not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)}")
+    overrides = parse_overrides(args.stage_threshold)
+
+    ctx = {"corpus": generate_corpus(args.resumes, args.jds, args.seed)}
+    results = {
+        "environment": environment(),
+        "config": {"repeat": args.repeat, "resumes": args.resumes, "jds": args.jds, "seed": args.seed},
+        "stages": {},
+    }
+
+    print(f"{'stage':>32} {'items':>6} {'median ms':>10} {'per item ms':>12} {'peak KB':>10}")
+    for name in names:
+        try:
+            run, n_items = STAGES[name](ctx)
+            stats = measure(run, n_items, args.repeat)
+        except Exception as e:
+            if not missing_dependency(e):
+                raise
+            # Missing optional dependency, model or data: record and move on
+            reason = next((line.strip() for line in str(e).splitlines() if any(c.isalnum() for c in line)), "")
+            results["stages"][name] = {"skipped": f"{type(e).__name__}: {reason}"}
+            print(f"{name:>32}  skipped ({results['stages'][name]['skipped']})")
+            continue
+        results["stages"][name] = stats
+        print(
+            f"{name:>32} {stats['items']:>6} {stats['median_ms']:>10.2f}"
+            f" {stats['per_item_ms']:>12.4f} {stats['peak_memory_kb']:>10.1f}"
+        )
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"📦 Wrote {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(
+            results, baseline, args.threshold, args.memory_threshold, overrides,
+            names if args.stages else None
+        )
+        if regressions:
+            print(f"\n❌ {len(regressions)} stage(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,19 @@
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from src.jd_scraper import DescriptionScraper
-from src.resume_parser import PdfParser
-import shutil
+from src.resume_parser import PdfParsePool, PdfTooLargeError
+import asyncio
 import os
+import tempfile
+import json
+import time
 from src.scorer import Resume_scorer, ResumeScorerPro
+from src.skill_index import SkillIndex
+from src.vector_store import VectorStore, encode_documents
+from src import metrics
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI()
@@ -20,25 +30,90 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-parser = PdfParser()
+# ------------------ Metrics ------------------
+# ATS_SERVER_TIMING=1 adds a Server-Timing header with per-stage durations
+SERVER_TIMING = os.getenv("ATS_SERVER_TIMING", "0") == "1"
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    token = metrics.start_request_timings() if SERVER_TIMING else None
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        elapsed = time.perf_counter() - start
+        timings = metrics.finish_request_timings(token) if token is not None else None
+
+    # Label by route template, not raw path, to keep the series count bounded
+    route = request.scope.get("route")
+    metrics.REGISTRY.observe(
+        "ats_http_request_duration_seconds",
+        elapsed,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    )
+    # Streaming bodies are produced after this point, so only setup work shows up
+    if timings is not None:
+        response.headers["Server-Timing"] = metrics.server_timing_header(timings, elapsed)
+    return response
+
+pdf_pool = PdfParsePool()
 scraper = DescriptionScraper()
 
 # Directory to store uploaded resumes
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+@app.on_event("shutdown")
+async def shutdown_workers():
+    pdf_pool.shutdown()
+    await scraper.close()
+    await generator.client.close()
+
 # ------------------ Resume Upload Endpoint ------------------
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def _save_upload(source, max_bytes: int = None) -> str:
+    """
+    Copy an upload to a new uniquely named file, so concurrent uploads with
+    the same filename never collide.
+
+    Raises:
+        PdfTooLargeError: As soon as more than max_bytes have been read (the partial file is removed)
+    """
+    fd, file_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            copied = 0
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                copied += len(chunk)
+                if max_bytes is not None and copied > max_bytes:
+                    raise PdfTooLargeError(f"PDF is larger than the {max_bytes} byte limit")
+                buffer.write(chunk)
+    except BaseException:
+        os.remove(file_path)
+        raise
+    return file_path
+
 @app.post("/upload_resume/")
 async def upload_resume(file: UploadFile = File(...)):
     """Uploads a PDF resume and extracts text"""
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-
-    # Save temporarily
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Save temporarily (blocking file I/O runs in the threadpool), stopping at the size limit
+    try:
+        file_path = await run_in_threadpool(_save_upload, file.file, pdf_pool.max_bytes)
+    except PdfTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-    # Parse text
-    resume_text = parser.Resume_parse(file_path)
+    # Parse text in the process pool so the event loop stays responsive
+    try:
+        resume_text = await pdf_pool.parse(file_path)
+    except PdfTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out while parsing the PDF")
+    finally:
+        os.remove(file_path)
 
     return {"filename": file.filename, "extracted_text": resume_text}
 
@@ -46,24 +121,180 @@ async def upload_resume(file: UploadFile = File(...)):
 @app.post("/scrape_jd/")
 async def scrape_jd(desc_link: str = Form(...)):
     """Scrapes job description from a given URL"""
-    jd_text = scraper.jd_scraper(desc_link)
+    jd_text = await scraper.jd_scraper_async(desc_link)
     if jd_text:
         return {"status": "success", "job_description": jd_text}
     else:
         return {"status": "error", "message": "Failed to extract job description"}
-from pydantic import BaseModel
+
+class ScrapeBatchRequest(BaseModel):
+    urls: List[str]
+    concurrency: int = 10
+    per_domain: int = 2
+
+MAX_SCRAPE_BATCH = 200
+
+@app.post("/scrape_jd_batch/")
+async def scrape_jd_batch(data: ScrapeBatchRequest):
+    """Scrapes many job links concurrently, streaming one NDJSON line per URL as it completes"""
+    if len(data.urls) > MAX_SCRAPE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SCRAPE_BATCH} URLs per batch")
+
+    concurrency = max(1, min(data.concurrency, 50))
+    per_domain = max(1, min(data.per_domain, 8))
+
+    async def stream():
+        async for result in scraper.scrape_many(data.urls, concurrency, per_domain):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 scorer = ResumeScorerPro()
 
+ExtractionMode = Literal["fast", "balanced", "full"]
+
 class ScoreRequest(BaseModel):
     resume_data: str
     jd_data: str
+    mode: ExtractionMode = "full"
+    time_budget_ms: Optional[float] = None
 
 @app.post("/score_resume/")
 def score_resume(data: ScoreRequest):
-    result = scorer.resume_skill_score(data.resume_data, data.jd_data)
+    """mode="fast" skips fuzzy and SBERT matching; the result has Partial=true if time_budget_ms ran out"""
+    time_budget_ms = max(0.0, data.time_budget_ms) if data.time_budget_ms is not None else None
+    result = scorer.resume_skill_score(data.resume_data, data.jd_data, data.mode, time_budget_ms)
     return result
 
+class BatchScoreRequest(BaseModel):
+    resumes: List[str]
+    jd_data: str
+    batch_size: int = 32
+    mode: ExtractionMode = "full"
+
+@app.post("/score_resume_batch/")
+def score_resume_batch(data: BatchScoreRequest):
+    """Scores many resumes against one JD, streaming one NDJSON line per resume"""
+    batch_size = max(1, min(data.batch_size, 256))
+
+    def stream():
+        results = scorer.resume_skill_score_batch(data.resumes, data.jd_data, batch_size, data.mode)
+        for index, result in results:
+            yield json.dumps({"index": index, **result}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# ------------------ Resume Index Endpoints ------------------
+# Persisted to ATS_SKILL_INDEX (default .cache/skill_index.npz) after every change.
+# Startup fails rather than discarding an unreadable index file; updates run as
+# file-locked transactions so several workers can share the file
+skill_index = SkillIndex.load_or_create()
+
+class IndexedResume(BaseModel):
+    resume_id: str
+    resume_data: str
+
+class IndexRequest(BaseModel):
+    resumes: List[IndexedResume]
+    batch_size: int = 32
+
+@app.post("/index/resumes/")
+def index_resumes(data: IndexRequest):
+    """Extracts each resume's skills and stores them in the skill index (re-adding an id replaces it)"""
+    batch_size = max(1, min(data.batch_size, 256))
+    texts = [r.resume_data for r in data.resumes]
+
+    skills = []
+    for start in range(0, len(texts), batch_size):
+        skills.extend(scorer.extractor.extract_skills_batch(texts[start:start + batch_size]))
+
+    with skill_index.transaction():
+        skill_index.add_many(zip((r.resume_id for r in data.resumes), skills))
+    return {"indexed": len(texts), **skill_index.stats()}
+
+@app.delete("/index/resumes/{resume_id}")
+def remove_indexed_resume(resume_id: str):
+    with skill_index.transaction():
+        removed = skill_index.remove(resume_id)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Resume is not in the index")
+    return skill_index.stats()
+
+class IndexSearchRequest(BaseModel):
+    jd_data: str
+    k: int = 10
+
+@app.post("/index/search/")
+def search_index(data: IndexSearchRequest):
+    """Top-k stored resumes for a JD, ranked by the same skill score as /score_resume/"""
+    jd_skills = scorer.extractor.extract_skills(data.jd_data)
+    skill_index.refresh()
+    return {
+        "Job Description Skills": jd_skills,
+        "results": skill_index.top_k(jd_skills, max(1, min(data.k, 1000)))
+    }
+
+@app.get("/index/stats/")
+def index_stats():
+    skill_index.refresh()
+    return skill_index.stats()
+
+# ------------------ Semantic Resume Search Endpoints ------------------
+# Embeddings come from the extractor's already loaded SBERT model. Startup fails
+# rather than discarding a store built with another model or encoder backend;
+# updates run as file-locked transactions so several workers can share the store
+vector_store = VectorStore.load_or_create(
+    scorer.extractor.sbert.get_sentence_embedding_dimension(),
+    dtype=os.getenv("ATS_VECTOR_DTYPE", "float32"),
+    model_name=scorer.extractor.sbert.cache_name
+)
+
+@app.post("/vectors/resumes/")
+def embed_resumes(data: IndexRequest):
+    """Embeds each resume and stores it in the vector store (re-adding an id replaces it)"""
+    batch_size = max(1, min(data.batch_size, 256))
+    embeddings = encode_documents(
+        scorer.extractor.sbert, [r.resume_data for r in data.resumes], batch_size=batch_size
+    )
+    with vector_store.transaction():
+        vector_store.add([r.resume_id for r in data.resumes], embeddings)
+    return {"embedded": len(data.resumes), **vector_store.stats()}
+
+@app.delete("/vectors/resumes/{resume_id}")
+def remove_embedded_resume(resume_id: str):
+    with vector_store.transaction():
+        removed = vector_store.remove(resume_id)
+    if not removed:
+        raise HTTPException(status_code=404, detail="Resume is not in the vector store")
+    return vector_store.stats()
+
+class VectorSearchRequest(BaseModel):
+    jd_data: str
+    k: int = 10
+    n_probe: Optional[int] = Field(None, ge=1)
+
+@app.post("/vectors/search/")
+def search_vectors(data: VectorSearchRequest):
+    """Top-k stored resumes by semantic similarity to a JD (n_probe uses the IVF index if built)"""
+    query = encode_documents(scorer.extractor.sbert, [data.jd_data])[0]
+    vector_store.refresh()
+    return {"results": vector_store.search(query, max(1, min(data.k, 1000)), data.n_probe)}
+
+class BuildIvfRequest(BaseModel):
+    n_lists: Optional[int] = Field(None, ge=1)
+
+@app.post("/vectors/build_ivf/")
+def build_ivf(data: BuildIvfRequest):
+    """(Re)builds the approximate index over the stored resumes"""
+    with vector_store.transaction():
+        vector_store.build_ivf(data.n_lists)
+    return vector_store.stats()
+
+@app.get("/vectors/stats/")
+def vector_stats():
+    vector_store.refresh()
+    return vector_store.stats()
+
 # ------------------ Email generator Endpoint ------------------
 class EmailRequest(BaseModel):
     resume_text:str
@@ -73,14 +304,98 @@ class EmailRequest(BaseModel):
     
     
 from src.email_genarator import EmailGenerator
+from src.ollama_client import QueueFullError
+
+generator = EmailGenerator(
+    max_in_flight=int(os.getenv("OLLAMA_MAX_IN_FLIGHT", "2")),
+    max_queue=int(os.getenv("OLLAMA_MAX_QUEUE", "16"))
+)
 
-generator = EmailGenerator()
+def _queue_full(e: QueueFullError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
 
 @app.post("/generate_email/")
-def generate_email(resume_data: str = Form(...), jd_data: str = Form(...), tone: str = Form("formal"), max_chars: int = Form(500)):
-    result = generator.generate_email(resume_data, jd_data, tone, max_chars)
+async def generate_email(resume_data: str = Form(...), jd_data: str = Form(...), tone: str = Form("formal"), max_chars: int = Form(500), fresh: bool = Form(False)):
+    """Set fresh=true to skip the message cache and generate a new variant"""
+    try:
+        result = await generator.agenerate_email(resume_data, jd_data, tone, max_chars, use_cache=not fresh)
+    except QueueFullError as e:
+        raise _queue_full(e)
     return result
 
+class VariantsRequest(BaseModel):
+    resume_data: str
+    jd_data: str
+    tones: Optional[List[str]] = None
+    message_types: Optional[List[str]] = None
+    max_chars: int = 500
+    concurrency: int = 4
+    fresh: bool = False
+
+@app.post("/generate_email_variants/")
+async def generate_email_variants(data: VariantsRequest):
+    """Generates every tone x message type combination, streaming one NDJSON line per variant as it finishes"""
+    concurrency = max(1, min(data.concurrency, generator.client.max_in_flight + generator.client.max_queue))
+
+    async def stream():
+        variants = generator.agenerate_variants(
+            data.resume_data,
+            data.jd_data,
+            data.tones,
+            data.message_types,
+            data.max_chars,
+            concurrency,
+            use_cache=not data.fresh
+        )
+        async for variant in variants:
+            yield json.dumps(variant) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/generate_email_stream/")
+async def generate_email_stream(resume_data: str = Form(...), jd_data: str = Form(...), tone: str = Form("formal"), max_chars: int = Form(500), message_type: str = Form("email"), fresh: bool = Form(False)):
+    """Streams the generated message as Server-Sent Events (token, then done or error)"""
+    # Reject before the 200 response starts if the queue is already full
+    try:
+        generator.client.ensure_capacity()
+    except QueueFullError as e:
+        raise _queue_full(e)
+
+    async def stream():
+        async for item in generator.astream_email(resume_data, jd_data, tone, max_chars, message_type, use_cache=not fresh):
+            event = item.pop("event")
+            yield _sse(event, item)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/generation_stats/")
+def generation_stats():
+    """Generation queue depth, rejections, queue wait, generation time and cache hit rate"""
+    return {**generator.client.metrics(), "cache": generator.cache.stats()}
+
+# ------------------ Prometheus Endpoint ------------------
+def _generation_queue_samples() -> list:
+    queue = generator.client.metrics()
+    return [
+        ("ats_ollama_in_flight", "gauge", "Generations running on the model", queue["in_flight"], {}),
+        ("ats_ollama_waiting", "gauge", "Generations waiting for a slot", queue["waiting"], {}),
+        ("ats_ollama_rejected_total", "counter", "Generations rejected with a full queue", queue["rejected"], {}),
+    ]
+
+metrics.REGISTRY.register_collector(_generation_queue_samples)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Stage latency histograms, event counters and queue gauges in Prometheus text format"""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
     
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,220 @@
+"""
+Small thread-safe caches shared by the scoring pipeline.
+An in-memory LRU tier can be backed by an optional SQLite tier that
+survives restarts and is shared by all workers on the host.
+"""
+
+from collections import OrderedDict
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class LRUCache:
+    """
+    Bounded mapping with least-recently-used eviction and hit/miss counters.
+    Entries optionally expire ttl seconds (or a per-entry ttl) after they were stored.
+    Safe to share between FastAPI worker threads.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value (marking it recently used) or default"""
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """
+        Insert or refresh a value, evicting the oldest entries when full.
+        ttl overrides the cache's ttl for this entry (e.g. the remaining
+        lifetime of a value copied from another tier).
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, None if ttl is None else time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Current size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False
+            return entry[1] is None or time.monotonic() <= entry[1]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class SqliteCache:
+    """
+    Persistent key -> JSON value store in a local SQLite file.
+    WAL mode lets several uvicorn workers read and write the same file.
+    Entries optionally expire ttl seconds after they were stored. Every
+    purge_every writes, expired entries are deleted and the oldest are
+    dropped down to max_entries, so the file stays bounded.
+    """
+
+    def __init__(self, path: str, ttl: float = None, max_entries: int = 100_000, purge_every: int = 256):
+        """
+        Args:
+            path: SQLite file (created if missing)
+            ttl: Seconds an entry stays valid (None: forever)
+            max_entries: Entries kept after a purge (None: unbounded)
+            purge_every: Writes between purges
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)")
+
+    def get(self, key, default=None):
+        value, _ = self.get_with_ttl(key, default)
+        return value
+
+    def get_with_ttl(self, key, default=None) -> tuple:
+        """(value, seconds until it expires or None if it never does), or (default, None)"""
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return default, None
+        if self.ttl is None:
+            return json.loads(row[0]), None
+        remaining = row[1] + self.ttl - time.time()
+        if remaining <= 0:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            return default, None
+        return json.loads(row[0]), remaining
+
+    def set(self, key, value):
+        payload = json.dumps(value)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            self._writes += 1
+            purge = self._writes >= self.purge_every
+            if purge:
+                self._writes = 0
+        if purge:
+            self.purge()
+
+    def purge(self):
+        """Delete expired entries, then the oldest ones beyond max_entries"""
+        with self._lock, self._conn:
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl,))
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    In-memory LRU in front of an optional persistent tier.
+    Disk hits are promoted to memory for their remaining lifetime; writes go
+    to both tiers.
+    """
+
+    def __init__(self, memory: LRUCache, disk: SqliteCache = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self.disk is not None:
+            try:
+                value, remaining = self.disk.get_with_ttl(key)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not read from disk cache: {e}")
+                return default
+            if value is not None:
+                if remaining is not None and self.memory.ttl is not None:
+                    remaining = min(remaining, self.memory.ttl)
+                self.memory.set(key, value, ttl=remaining)
+                return value
+        return default
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not write to disk cache: {e}")
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), "disk": self.disk.path if self.disk is not None else None}
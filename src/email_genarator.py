@@ -1,12 +1,104 @@
 import requests
+import aiohttp
+import asyncio
+import hashlib
+import os
 import re
-from typing import Dict, Literal
+from typing import AsyncIterator, Dict, Iterator, List, Literal
+
+from src.cache import LRUCache, SqliteCache, TieredCache
+from src.metrics import count
+from src.ollama_client import OllamaClient, OllamaError, QueueFullError
+
+CONNECT_ERROR = "Cannot connect to Ollama. Please run 'ollama serve' in terminal first."
+TIMEOUT_ERROR = "Request timeout. Try: 1) Reducing max_chars, 2) Restarting Ollama, 3) Using a smaller model"
+
+# Ollama chat templates for a single user prompt, as (text before, text after),
+# so raw-mode prompts are tokenized exactly like templated ones. Matched by exact
+# model family (the name without namespace and tag), since related models such
+# as llama3.2-vision or qwen2.5 use different templates.
+CHAT_TEMPLATES = {
+    "llama3.2": (
+        "<|start_header_id|>system<|end_header_id|>\n\nCutting Knowledge Date: December 2023\n\n<|eot_id|>"
+        "<|start_header_id|>user<|end_header_id|>\n\n",
+        "<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n"
+    ),
+    "llama3": (
+        "<|start_header_id|>user<|end_header_id|>\n\n",
+        "<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n"
+    ),
+    "qwen2": ("<|im_start|>user\n", "<|im_end|>\n<|im_start|>assistant\n"),
+    "gemma2": ("<start_of_turn>user\n", "<end_of_turn>\n<start_of_turn>model\n"),
+    "phi3": ("<|user|>\n", "<|end|>\n<|assistant|>\n"),
+    "mistral": ("[INST] ", " [/INST]"),
+}
+
+
+def chat_template(model_name: str):
+    """(before, after) prompt template for an Ollama model, or None if unknown"""
+    family = model_name.split("/")[-1].split(":")[0]
+    return CHAT_TEMPLATES.get(family)
+
+
+# Models already reported as having no known chat template
+_UNTEMPLATED_MODELS = set()
+
 
 class EmailGenerator:
-    def __init__(self, model_name="llama3.2", ollama_url="http://localhost:11434"):
+    # Bump whenever prompts or post-processing change so cached messages are invalidated
+    PROMPT_VERSION = 2
+    
+    def __init__(
+        self,
+        model_name="llama3.2",
+        ollama_url="http://localhost:11434",
+        max_in_flight: int = 2,
+        max_queue: int = 16,
+        cache_size: int = 512,
+        cache_ttl: float = 86400.0,
+        cache_path: str = None,
+        reuse_prefix: bool = True,
+        prompt_template: tuple = None
+    ):
+        """
+        Args:
+            model_name: Ollama model used for generation
+            ollama_url: Ollama server URL
+            max_in_flight: Generations running on the model at once (async path)
+            max_queue: Generations allowed to wait for a free slot (async path)
+            cache_size: In-memory cache entries for generated messages
+            cache_ttl: Seconds a generated message is reused before regenerating
+            cache_path: Optional SQLite file for a persistent cache tier
+                        (defaults to the EMAIL_CACHE_DB env var)
+            reuse_prefix: In variant batches, prime the shared prompt prefix and
+                          send templated raw prompts that Ollama's prompt cache
+                          can skip (needs a known or given prompt_template;
+                          single generations always use Ollama's own template)
+            prompt_template: (before, after) chat template for raw prompts
+                             (defaults to the CHAT_TEMPLATES entry for model_name)
+        """
         self.model = model_name
         self.ollama_url = ollama_url
         
+        # Shared async client with a bounded generation queue (used by the API)
+        self.client = OllamaClient(ollama_url, max_in_flight=max_in_flight, max_queue=max_queue)
+        
+        # Generated messages keyed by inputs + settings; regenerating the same email is a lookup
+        cache_path = cache_path or os.getenv("EMAIL_CACHE_DB")
+        self.cache = TieredCache(
+            LRUCache(cache_size, ttl=cache_ttl),
+            SqliteCache(cache_path, ttl=cache_ttl) if cache_path else None
+        )
+        
+        # Raw prompts start with the same tokens for every message about one
+        # resume/JD pair, so Ollama only evaluates the suffix once the prefix is cached
+        self.prompt_template = prompt_template or chat_template(model_name)
+        self.reuse_prefix = reuse_prefix
+        if reuse_prefix and self.prompt_template is None and model_name not in _UNTEMPLATED_MODELS:
+            _UNTEMPLATED_MODELS.add(model_name)
+            print(f"⚠️ No chat template known for {model_name}, using templated prompts without prefix reuse")
+        self._priming = {}
+        
         # Define tone characteristics
         self.tone_modifiers = {
             "formal": {
@@ -102,76 +194,86 @@ class EmailGenerator:
             "role": role
         }
 
-    def _build_prompt(
+    def _skills_str(self, context: Dict[str, str]) -> str:
+        return ", ".join(context["matching_skills"]) if context["matching_skills"] else "relevant technical skills"
+
+    def _build_prompt_prefix(self, context: Dict[str, str]) -> str:
+        """
+        The part of the prompt shared by one resume/JD pair (job context,
+        candidate background, verified skills and the grounding rules),
+        identical across tones, message types and lengths.
+        """
+        skills_str = self._skills_str(context)
+        return f"""You write short job application messages for a candidate applying to the {context['role']} position at {context['company']}.
+
+Job context:
+{context['jd_snippet'][:500]}
+
+Candidate background (use ONLY what's mentioned here):
+{context['resume_snippet'][:500]}
+
+Candidate's verified skills: {skills_str}
+
+RULES FOR EVERY MESSAGE:
+- ONLY mention skills from the verified list above
+- DO NOT invent, fabricate or hallucinate skills or experience
+- Only reference actual experience from the candidate background
+- Write ONLY the message itself, no notes or explanations
+"""
+
+    def _build_prompt_parts(
         self, 
         context: Dict[str, str], 
         tone: str, 
         message_type: str, 
         max_chars: int
-    ) -> str:
-        """Build optimized prompt based on constraints"""
+    ) -> tuple:
+        """Build the prompt as (shared prefix, task-specific suffix)"""
         
         tone_info = self.tone_modifiers.get(tone, self.tone_modifiers["formal"])
         template_info = self.message_templates.get(message_type, self.message_templates["email"])
         
         # Build skill mention string
-        skills_str = ", ".join(context["matching_skills"]) if context["matching_skills"] else "relevant technical skills"
+        skills_str = self._skills_str(context)
+        first_skill = skills_str.split(',')[0] if context["matching_skills"] else "relevant tools"
+        
+        prefix = self._build_prompt_prefix(context)
         
         # Custom instructions per message type
         if message_type == "linkedin":
-            specific_instructions = f"""
+            suffix = f"""
 Write a LinkedIn DM to a recruiter/hiring manager about the {context['role']} position at {context['company']}.
 
 CRITICAL RULES:
 - Maximum {max_chars} characters (HARD LIMIT - count every character including spaces)
 - No subject line, no signature, no "Dear X"
 - Start directly with a hook
-- ONLY mention skills from this verified list: {skills_str}
-- DO NOT make up or hallucinate any skills
 - End with a simple connection request
 - Tone: {tone_info['style']}
 - Avoid: {tone_info['avoid']}
 
-Candidate's actual verified skills: {skills_str}
-
-Example opening: "Hi! Saw your {context['role']} post — I've worked with [ONLY USE: {skills_str.split(',')[0] if context['matching_skills'] else 'relevant tools'}] and would love to connect."
-
-Job context:
-{context['jd_snippet'][:400]}
-
-Candidate background (use ONLY what's mentioned here):
-{context['resume_snippet'][:400]}
+Example opening: "Hi! Saw your {context['role']} post — I've worked with [ONLY USE: {first_skill}] and would love to connect."
 
 Write ONLY the message using real skills. Count characters carefully."""
 
         elif message_type == "cover":
-            specific_instructions = f"""
+            suffix = f"""
 Answer the interview question: "Why are you interested in this role at {context['company']}?"
 
 CRITICAL RULES:
 - Maximum {max_chars} characters (HARD LIMIT - count every character)
 - {template_info['max_paragraphs']} paragraphs maximum
 - Be authentic and specific
-- ONLY reference skills the candidate actually has: {skills_str}
-- DO NOT fabricate or hallucinate skills
 - Show genuine interest in {context['company']}
 - Tone: {tone_info['style']}
 - Avoid: {tone_info['avoid']}, generic statements, making up experience
 
-Candidate's verified skills: {skills_str}
-
-Example: "I'm drawn to this {context['role']} position because it aligns with my experience in [USE ONLY: {skills_str.split(',')[0] if context['matching_skills'] else 'relevant areas'}]. Having worked on [mention actual project from resume], I'm excited to contribute to your team's goals."
-
-Role requirements:
-{context['jd_snippet'][:500]}
-
-Candidate's actual experience (stick to what's written here):
-{context['resume_snippet'][:500]}
+Example: "I'm drawn to this {context['role']} position because it aligns with my experience in [USE ONLY: {first_skill if context['matching_skills'] else 'relevant areas'}]. Having worked on [mention actual project from resume], I'm excited to contribute to your team's goals."
 
 Write ONLY the answer using verified skills. Stay under {max_chars} characters."""
 
         else:  # email
-            specific_instructions = f"""
+            suffix = f"""
 Write a cold email applying for {context['role']} at {context['company']}.
 
 CRITICAL RULES:
@@ -179,27 +281,188 @@ CRITICAL RULES:
 - No "Dear Hiring Manager", no formal headers, no greetings
 - Structure: {template_info['structure']}
 - You MUST ONLY mention skills that appear in BOTH the resume AND job description
-- Matching skills available: {skills_str}
-- DO NOT invent or hallucinate skills not in the resume
 - End with clear CTA (e.g., "Would love to discuss further")
 - Tone: {tone_info['style']}
 - Avoid: {tone_info['avoid']}, buzzwords like "passionate", "leverage", making up experience
 
-IMPORTANT: Only reference actual experience from the candidate's background below. Do not fabricate skills.
+Example format: "Hi, I noticed your {context['role']} opening. I've worked extensively with [ONLY USE SKILLS FROM: {skills_str}] which directly addresses your requirements. [One specific accomplishment]. Happy to discuss my experience further."
 
-What they need:
-{context['jd_snippet'][:450]}
+Write ONLY the email body using REAL skills from the resume. Stay strictly under {max_chars} characters."""
 
-What the candidate actually has:
-{context['resume_snippet'][:450]}
+        return prefix, suffix
 
-Candidate's proven skills: {skills_str}
+    def _build_prompt(
+        self, 
+        context: Dict[str, str], 
+        tone: str, 
+        message_type: str, 
+        max_chars: int
+    ) -> str:
+        """Build optimized prompt based on constraints"""
+        prefix, suffix = self._build_prompt_parts(context, tone, message_type, max_chars)
+        return prefix + suffix
 
-Example format: "Hi, I noticed your {context['role']} opening. I've worked extensively with [ONLY USE SKILLS FROM: {skills_str}] which directly addresses your requirements. [One specific accomplishment]. Happy to discuss my experience further."
+    def _validate(self, resume_text: str, jd_text: str, max_chars: int):
+        """Return an error dict for invalid inputs, else None"""
+        if not resume_text or not jd_text:
+            return {"error": "Resume and job description are required"}
+        
+        if max_chars < 100 or max_chars > 1000:
+            return {"error": "max_chars must be between 100 and 1000"}
+        
+        return None
 
-Write ONLY the email body using REAL skills from the resume. Stay strictly under {max_chars} characters."""
+    def _cache_key(self, resume_text: str, jd_text: str, tone: str, message_type: str, max_chars: int) -> str:
+        resume_digest = hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+        jd_digest = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+        return f"email:{self.PROMPT_VERSION}:{self.model}:{tone}:{message_type}:{max_chars}:{resume_digest}:{jd_digest}"
+
+    def _cached(self, key: str):
+        """Return a copy of the cached message marked as a cache hit, or None"""
+        result = self.cache.get(key)
+        if result is None:
+            count("email.cache_miss")
+            return None
+        count("email.cache_hit")
+        print(f"📦 Cached {result['type']} | Tone: {result['tone']}")
+        return {**result, "cached": True}
+
+    def _store(self, key: str, result: Dict) -> Dict:
+        """Cache a successful generation and mark it as fresh"""
+        if "error" not in result:
+            self.cache.set(key, result)
+            result = {**result, "cached": False}
+        return result
+
+    def _build_payload(
+        self,
+        prompt: str,
+        tone: str,
+        max_chars: int,
+        stream: bool = False,
+        raw: bool = False
+    ) -> dict:
+        """Ollama /api/generate request body; raw prompts already have the chat template applied"""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": 0.6 if tone in ["formal", "cold"] else 0.75,
+                "top_p": 0.9,
+                "num_predict": max_chars + 50,  # Small buffer
+                "stop": ["---", "Note:", "Example:", "\n\n\n"]  # Stop tokens
+            }
+        }
+        if raw:
+            payload["raw"] = True
+        return payload
+
+    @property
+    def _reuses_prefix(self) -> bool:
+        return self.reuse_prefix and self.prompt_template is not None
+
+    async def _prime_prefix(self, prefix: str):
+        """Have Ollama evaluate (and cache) a templated prompt prefix; failures only cost the reuse"""
+        before, _ = self.prompt_template
+        payload = {
+            "model": self.model,
+            "prompt": before + prefix,
+            "raw": True,
+            "stream": False,
+            "options": {"temperature": 0, "num_predict": 1}
+        }
+        try:
+            await self.client.generate(payload)
+        except Exception as e:
+            print(f"⚠️ Could not prime prompt prefix: {e}")
+
+    def _priming_done(self, key: str, task: asyncio.Task):
+        self._priming.pop(key, None)
+
+    async def _ensure_primed(self, context: Dict[str, str]):
+        """
+        Prime the shared prompt prefix before a batch of generations for one
+        resume/JD pair; concurrent callers share one priming request.
+        
+        One-off generations skip this and are sent as ordinary templated prompts.
+        """
+        if not self._reuses_prefix:
+            return
+        
+        prefix = self._build_prompt_prefix(context)
+        key = hashlib.sha256(f"{self.model}\n{prefix}".encode("utf-8")).hexdigest()
+        task = self._priming.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._prime_prefix(prefix))
+            self._priming[key] = task
+            task.add_done_callback(lambda t: self._priming_done(key, t))
+        
+        # Shield so one cancelled caller doesn't cancel the shared priming
+        await asyncio.shield(task)
 
-        return specific_instructions
+    def _prompt_payload(
+        self,
+        context: Dict[str, str],
+        tone: str,
+        message_type: str,
+        max_chars: int,
+        stream: bool = False,
+        shared_prefix: bool = False
+    ) -> dict:
+        """
+        Request body for one message. When shared_prefix is set (a primed
+        variant batch) and prefix reuse is on, the prompt is sent raw with the
+        chat template applied here, so every message for a resume/JD pair
+        starts with the same tokens and is a clean continuation of the cached
+        prefix; otherwise Ollama applies the model's own template.
+        """
+        prefix, suffix = self._build_prompt_parts(context, tone, message_type, max_chars)
+        if not (shared_prefix and self._reuses_prefix):
+            return self._build_payload(prefix + suffix, tone, max_chars, stream)
+        before, after = self.prompt_template
+        return self._build_payload(before + prefix + suffix + after, tone, max_chars, stream, raw=True)
+
+    def _finalize(self, generated_text: str, tone: str, max_chars: int, message_type: str) -> Dict[str, str]:
+        """Clean raw model output and build the response dict"""
+        if not generated_text:
+            return {"error": "Model returned empty response"}
+        
+        # Clean up common LLM artifacts
+        generated_text = self._clean_output(generated_text, message_type)
+        
+        # Enforce strict character limit with smart truncation
+        if len(generated_text) > max_chars:
+            generated_text = self._smart_truncate(generated_text, max_chars, message_type)
+        
+        actual_length = len(generated_text)
+        
+        # Validate output meets minimum quality
+        if actual_length < 50:
+            return {"error": "Generated text too short - try increasing max_chars"}
+        
+        print(f"✅ Generated {message_type} | Tone: {tone} | Length: {actual_length}/{max_chars} chars")
+        
+        return {
+            "type": message_type,
+            "content": generated_text,
+            "actual_length": actual_length,
+            "max_allowed": max_chars,
+            "tone": tone
+        }
+
+    def _replay(self, result: Dict) -> Iterator[Dict]:
+        """Stream events for a cached message"""
+        yield {"event": "token", "text": result["content"]}
+        yield {"event": "done", **result, "truncated": False}
+
+    def _clip_chunk(self, text: str, emitted: int, max_chars: int) -> tuple:
+        """Fit a streamed chunk into the remaining budget; returns (text, limit_reached)"""
+        if not emitted:
+            text = text.lstrip()
+        if emitted + len(text) >= max_chars:
+            return text[:max_chars - emitted], True
+        return text, False
 
     def generate_email(
         self, 
@@ -207,7 +470,8 @@ Write ONLY the email body using REAL skills from the resume. Stay strictly under
         jd_text: str, 
         tone: Literal["formal", "friendly", "cold", "warm"] = "formal",
         max_chars: int = 500,
-        message_type: Literal["email", "linkedin", "cover"] = "email"
+        message_type: Literal["email", "linkedin", "cover"] = "email",
+        use_cache: bool = True
     ) -> Dict[str, str]:
         """
         Generate professional messages with strict constraint enforcement.
@@ -218,17 +482,23 @@ Write ONLY the email body using REAL skills from the resume. Stay strictly under
             tone: Writing style (formal/friendly/cold/warm)
             max_chars: Maximum character count (strictly enforced)
             message_type: Type of message (email/linkedin/cover)
+            use_cache: Reuse a cached message for identical inputs; pass False
+                       to force a fresh variant (which then replaces the cached one)
             
         Returns:
-            Dict with 'content', 'type', 'actual_length', or 'error'
+            Dict with 'content', 'type', 'actual_length', 'cached', or 'error'
         """
         
         # Validate inputs
-        if not resume_text or not jd_text:
-            return {"error": "Resume and job description are required"}
+        error = self._validate(resume_text, jd_text, max_chars)
+        if error:
+            return error
         
-        if max_chars < 100 or max_chars > 1000:
-            return {"error": "max_chars must be between 100 and 1000"}
+        key = self._cache_key(resume_text, jd_text, tone, message_type, max_chars)
+        if use_cache:
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
         
         try:
             # Extract relevant context
@@ -240,17 +510,7 @@ Write ONLY the email body using REAL skills from the resume. Stay strictly under
             # Call Ollama API
             response = requests.post(
                 f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.6 if tone in ["formal", "cold"] else 0.75,
-                        "top_p": 0.9,
-                        "num_predict": max_chars + 50,  # Small buffer
-                        "stop": ["---", "Note:", "Example:", "\n\n\n"]  # Stop tokens
-                    }
-                },
+                json=self._build_payload(prompt, tone, max_chars),
                 timeout=90
             )
             
@@ -260,44 +520,234 @@ Write ONLY the email body using REAL skills from the resume. Stay strictly under
             result = response.json()
             generated_text = result.get("response", "").strip()
             
-            if not generated_text:
-                return {"error": "Model returned empty response"}
-            
-            # Clean up common LLM artifacts
-            generated_text = self._clean_output(generated_text, message_type)
-            
-            # Enforce strict character limit with smart truncation
-            if len(generated_text) > max_chars:
-                generated_text = self._smart_truncate(generated_text, max_chars, message_type)
-            
-            actual_length = len(generated_text)
-            
-            # Validate output meets minimum quality
-            if actual_length < 50:
-                return {"error": "Generated text too short - try increasing max_chars"}
-            
-            print(f"✅ Generated {message_type} | Tone: {tone} | Length: {actual_length}/{max_chars} chars")
-            
-            return {
-                "type": message_type,
-                "content": generated_text,
-                "actual_length": actual_length,
-                "max_allowed": max_chars,
-                "tone": tone
-            }
+            return self._store(key, self._finalize(generated_text, tone, max_chars, message_type))
             
         except requests.exceptions.ConnectionError:
-            return {
-                "error": "Cannot connect to Ollama. Please run 'ollama serve' in terminal first."
-            }
+            return {"error": CONNECT_ERROR}
         except requests.exceptions.Timeout:
-            return {
-                "error": "Request timeout. Try: 1) Reducing max_chars, 2) Restarting Ollama, 3) Using a smaller model"
-            }
+            return {"error": TIMEOUT_ERROR}
         except Exception as e:
             print(f"❌ Unexpected error: {str(e)}")
             return {"error": f"Generation failed: {str(e)}"}
 
+    async def agenerate_email(
+        self,
+        resume_text: str,
+        jd_text: str,
+        tone: Literal["formal", "friendly", "cold", "warm"] = "formal",
+        max_chars: int = 500,
+        message_type: Literal["email", "linkedin", "cover"] = "email",
+        use_cache: bool = True
+    ) -> Dict[str, str]:
+        """
+        Async generate_email through the pooled client and generation queue.
+        
+        Raises:
+            QueueFullError: If the generation queue is full (callers should reject fast)
+        """
+        error = self._validate(resume_text, jd_text, max_chars)
+        if error:
+            return error
+        
+        key = self._cache_key(resume_text, jd_text, tone, message_type, max_chars)
+        if use_cache:
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+        
+        context = self._extract_relevant_context(resume_text, jd_text)
+        return await self._agenerate_from_context(context, key, tone, message_type, max_chars)
+
+    async def _agenerate_from_context(
+        self,
+        context: Dict[str, str],
+        key: str,
+        tone: str,
+        message_type: str,
+        max_chars: int,
+        shared_prefix: bool = False
+    ) -> Dict[str, str]:
+        """Prompt, generate, finalize and cache one message for an already extracted context"""
+        try:
+            payload = self._prompt_payload(context, tone, message_type, max_chars, shared_prefix=shared_prefix)
+            result = await self.client.generate(payload)
+        except QueueFullError:
+            raise
+        except OllamaError as e:
+            return {"error": str(e)}
+        except aiohttp.ClientConnectionError:
+            return {"error": CONNECT_ERROR}
+        except asyncio.TimeoutError:
+            return {"error": TIMEOUT_ERROR}
+        except Exception as e:
+            print(f"❌ Unexpected error: {str(e)}")
+            return {"error": f"Generation failed: {str(e)}"}
+        
+        generated_text = result.get("response", "").strip()
+        return self._store(key, self._finalize(generated_text, tone, max_chars, message_type))
+
+    async def agenerate_variants(
+        self,
+        resume_text: str,
+        jd_text: str,
+        tones: List[str] = None,
+        message_types: List[str] = None,
+        max_chars: int = 500,
+        concurrency: int = 4,
+        use_cache: bool = True
+    ) -> AsyncIterator[Dict]:
+        """
+        Generate every tone x message_type combination, yielding each as it finishes.
+        
+        Context is extracted once and shared by all variants, and the shared
+        prompt prefix is primed once when more than one variant needs
+        generating; at most concurrency generations are submitted to the
+        queue at a time.
+        
+        Args:
+            resume_text: Candidate's resume content
+            jd_text: Job description text
+            tones: Tones to generate (defaults to all)
+            message_types: Message types to generate (defaults to all)
+            max_chars: Maximum character count for every variant
+            concurrency: Maximum generations in flight for this call
+            use_cache: Reuse cached messages for identical inputs
+        
+        Yields:
+            Dicts with index, tone and type plus the generate_email fields or 'error'
+        """
+        tones = tones or list(self.tone_modifiers)
+        message_types = message_types or list(self.message_templates)
+        combos = [(tone, message_type) for message_type in message_types for tone in tones]
+        
+        error = self._validate(resume_text, jd_text, max_chars)
+        if not error:
+            unknown = [t for t in tones if t not in self.tone_modifiers]
+            unknown += [m for m in message_types if m not in self.message_templates]
+            if unknown:
+                error = {"error": f"Unknown tone or message type: {', '.join(unknown)}"}
+        if error:
+            for index, (tone, message_type) in enumerate(combos):
+                yield {"index": index, "tone": tone, "type": message_type, **error}
+            return
+        
+        keys = [self._cache_key(resume_text, jd_text, tone, message_type, max_chars) for tone, message_type in combos]
+        # Probe the cache once per variant so hits and misses are counted once
+        cached = [self._cached(key) if use_cache else None for key in keys]
+        uncached = sum(result is None for result in cached)
+        context = None
+        slots = asyncio.Semaphore(concurrency)
+        
+        async def generate_one(index: int, tone: str, message_type: str) -> Dict:
+            nonlocal context
+            variant = {"index": index, "tone": tone, "type": message_type}
+            if cached[index] is not None:
+                return {**variant, **cached[index]}
+            
+            if context is None:
+                context = self._extract_relevant_context(resume_text, jd_text)
+            # Only a batch shares its prefix: prime it and send raw prompts that continue it
+            shared_prefix = uncached > 1
+            if shared_prefix:
+                await self._ensure_primed(context)
+            async with slots:
+                try:
+                    result = await self._agenerate_from_context(
+                        context, keys[index], tone, message_type, max_chars, shared_prefix
+                    )
+                except QueueFullError as e:
+                    result = {"error": str(e)}
+            return {**variant, **result}
+        
+        tasks = [
+            asyncio.create_task(generate_one(index, tone, message_type))
+            for index, (tone, message_type) in enumerate(combos)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away or caller stopped early
+            for task in tasks:
+                task.cancel()
+
+    async def astream_email(
+        self,
+        resume_text: str,
+        jd_text: str,
+        tone: Literal["formal", "friendly", "cold", "warm"] = "formal",
+        max_chars: int = 500,
+        message_type: Literal["email", "linkedin", "cover"] = "email",
+        use_cache: bool = True
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream a generated message token by token through the pooled client.
+        
+        max_chars is enforced as text arrives: once the limit is reached the
+        last token is clipped and the upstream request is closed, which stops
+        generation in Ollama.
+        
+        Yields:
+            {"event": "token", "text": ...} for each chunk, then a final
+            {"event": "done", ...} with the cleaned message (same fields as
+            generate_email plus 'truncated'), or {"event": "error", "error": ...}.
+            A cache hit yields the whole message as a single token event.
+        """
+        error = self._validate(resume_text, jd_text, max_chars)
+        if error:
+            yield {"event": "error", **error}
+            return
+        
+        key = self._cache_key(resume_text, jd_text, tone, message_type, max_chars)
+        if use_cache:
+            cached = self._cached(key)
+            if cached is not None:
+                for event in self._replay(cached):
+                    yield event
+                return
+        
+        context = self._extract_relevant_context(resume_text, jd_text)
+        payload = self._prompt_payload(context, tone, message_type, max_chars, stream=True)
+        
+        pieces = []
+        emitted = 0
+        truncated = False
+        chunks = self.client.generate_stream(payload)
+        try:
+            async for chunk in chunks:
+                text, truncated = self._clip_chunk(chunk.get("response", ""), emitted, max_chars)
+                if text:
+                    pieces.append(text)
+                    emitted += len(text)
+                    yield {"event": "token", "text": text}
+                if truncated or chunk.get("done"):
+                    break
+        except QueueFullError as e:
+            yield {"event": "error", "error": str(e)}
+            return
+        except OllamaError as e:
+            yield {"event": "error", "error": str(e)}
+            return
+        except aiohttp.ClientConnectionError:
+            yield {"event": "error", "error": CONNECT_ERROR}
+            return
+        except asyncio.TimeoutError:
+            yield {"event": "error", "error": TIMEOUT_ERROR}
+            return
+        except Exception as e:
+            print(f"❌ Unexpected error: {str(e)}")
+            yield {"event": "error", "error": f"Generation failed: {str(e)}"}
+            return
+        finally:
+            # Closes the upstream connection, which stops generation in Ollama
+            await chunks.aclose()
+        
+        result = self._finalize("".join(pieces).strip(), tone, max_chars, message_type)
+        if "error" in result:
+            yield {"event": "error", **result}
+        else:
+            yield {"event": "done", **self._store(key, result), "truncated": truncated}
+
     def _clean_output(self, text: str, message_type: str) -> str:
         """Remove common LLM artifacts and formatting issues"""
         
@@ -0,0 +1,161 @@
+"""
+Embedding caches for the Hybrid Skill Extractor.
+Skill database embeddings are persisted to disk so workers can memory-map
+them at startup instead of re-encoding the whole database, and candidate
+phrase embeddings are kept in a bounded in-memory LRU cache.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.cache import LRUCache
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+
+class SkillEmbeddingCache:
+    """
+    Versioned on-disk store of normalized skill embeddings.
+
+    Each artifact is a ``.npy`` file plus a ``.json`` sidecar, named after the
+    model and a hash of the skill list. A changed database or model produces a
+    new key, so stale artifacts are never reused.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = Path(cache_dir or os.getenv("ATS_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+    def fingerprint(self, model_name: str, skills: list) -> str:
+        """Hash of everything the embeddings depend on"""
+        payload = json.dumps(
+            {"format": self.FORMAT_VERSION, "model": model_name, "skills": skills},
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, model_name: str, key: str) -> tuple:
+        slug = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name)
+        stem = f"skill_embeddings-{slug}-{key[:16]}"
+        return self.cache_dir / f"{stem}.npy", self.cache_dir / f"{stem}.json"
+
+    def _load(self, array_path: Path, meta_path: Path, key: str, n_skills: int):
+        """Memory-map a cached artifact, or return None if missing/invalid"""
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("key") != key:
+                return None
+            embeddings = np.load(array_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        if embeddings.ndim != 2 or embeddings.shape[0] != n_skills or embeddings.dtype != np.float32:
+            return None
+        return embeddings
+
+    def _save(self, array_path: Path, meta_path: Path, key: str, model_name: str, embeddings: np.ndarray):
+        """Write the artifact atomically so concurrent workers never see partial files"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".npy.tmp", delete=False) as tmp:
+            np.save(tmp, embeddings)
+        os.replace(tmp.name, array_path)
+
+        meta = {
+            "format": self.FORMAT_VERSION,
+            "key": key,
+            "model": model_name,
+            "count": int(embeddings.shape[0]),
+            "dim": int(embeddings.shape[1]),
+        }
+        with tempfile.NamedTemporaryFile("w", dir=self.cache_dir, suffix=".json.tmp", delete=False, encoding="utf-8") as tmp:
+            json.dump(meta, tmp)
+        os.replace(tmp.name, meta_path)
+
+    def load_or_build(self, model, model_name: str, skills: list) -> np.ndarray:
+        """
+        Return normalized float32 skill embeddings, encoding only on a cache miss.
+
+        Args:
+            model: Encoder (see src.encoders) used on a miss
+            model_name: Model and backend identifier, part of the cache key
+            skills: Skill phrases, in database order
+
+        Returns:
+            (len(skills), dim) array, memory-mapped read-only when cached
+        """
+        key = self.fingerprint(model_name, skills)
+        array_path, meta_path = self._paths(model_name, key)
+
+        embeddings = self._load(array_path, meta_path, key, len(skills))
+        if embeddings is not None:
+            print(f"📦 Loaded cached skill embeddings from {array_path.name}")
+            return embeddings
+
+        print("📊 Pre-computing skill embeddings...")
+        embeddings = model.encode(skills, convert_to_numpy=True, normalize_embeddings=True)
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        try:
+            self._save(array_path, meta_path, key, model_name, embeddings)
+        except OSError as e:
+            print(f"⚠️ Could not persist skill embeddings: {e}")
+            return embeddings
+
+        return np.load(array_path, mmap_mode="r")
+
+
+class PhraseEmbeddingCache:
+    """
+    Bounded phrase -> embedding cache in front of a sentence encoder.
+    Only phrases that miss the cache reach the model, in one batched call.
+    """
+
+    def __init__(self, model, maxsize: int = 20000):
+        """
+        Args:
+            model: Encoder (see src.encoders) used for cache misses
+            maxsize: Maximum number of cached phrases (~1.5 KB each for MiniLM)
+        """
+        self.model = model
+        self._cache = LRUCache(maxsize)
+
+    def encode(self, phrases: list, batch_size: int = 32) -> np.ndarray:
+        """
+        Return normalized float32 embeddings for phrases, in input order.
+
+        Args:
+            phrases: Candidate phrases
+            batch_size: Model batch size for the cache misses
+
+        Returns:
+            (len(phrases), dim) array
+        """
+        vectors = [self._cache.get(phrase) for phrase in phrases]
+
+        # dict.fromkeys dedupes while keeping order
+        missing = list(dict.fromkeys(p for p, v in zip(phrases, vectors) if v is None))
+        if missing:
+            encoded = self.model.encode(
+                missing, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+            )
+            encoded = np.asarray(encoded, dtype=np.float32)
+            # Copy rows so evicting one phrase doesn't pin the whole batch in memory
+            fresh = {phrase: vector.copy() for phrase, vector in zip(missing, encoded)}
+            for phrase, vector in fresh.items():
+                self._cache.set(phrase, vector)
+            vectors = [v if v is not None else fresh[p] for p, v in zip(phrases, vectors)]
+
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def stats(self) -> dict:
+        """Cache size and hit/miss counters"""
+        return self._cache.stats()
@@ -0,0 +1,363 @@
+"""
+Sentence encoder backends for the Hybrid Skill Extractor.
+
+Every backend exposes the subset of the SentenceTransformer API the
+pipeline uses (encode, get_sentence_embedding_dimension) plus a cache_name
+that goes into embedding cache keys, so vectors from different backends
+are never mixed.
+
+    torch      sentence-transformers on PyTorch (default)
+    onnx       the same model exported to ONNX, run with onnxruntime
+    onnx-int8  the ONNX export with dynamically quantized int8 weights
+
+The ONNX backends only need onnxruntime, tokenizers and numpy at runtime;
+torch and sentence-transformers are imported once, to export the model
+the first time it is used. Exports are stored under the cache directory
+together with PyTorch embeddings of a fixed probe set, and an ONNX encoder
+refuses to load if its embeddings drift from those beyond a tolerance.
+int8 weights can still flip borderline semantic matches, so compare the
+extracted skills with benchmarks/bench_encoders.py before switching a
+deployment to onnx-int8.
+"""
+
+import inspect
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from src.embedding_cache import DEFAULT_CACHE_DIR
+
+
+# Phrases embedded by both runtimes to check an ONNX export against PyTorch
+PARITY_PROBES = [
+    "python", "java", "sql", "aws", "docker", "kubernetes", "react", "git",
+    "machine learning", "deep learning", "natural language processing",
+    "data analysis", "project management", "continuous integration",
+    "rest api design", "unit testing", "agile methodologies", "cloud computing",
+    "built rest apis with fastapi and postgresql",
+    "migrated a monolith to microservices on kubernetes",
+    "trained and deployed pytorch models for text classification",
+    "led a team of five engineers through weekly sprint planning",
+    "experience with distributed systems and message queues",
+    "strong communication and stakeholder management skills",
+]
+
+
+def _thread_setting(threads: int = None) -> int:
+    """Explicit thread count, else ATS_ENCODER_THREADS, else 0 (library default)"""
+    if threads is not None:
+        return threads
+    return int(os.getenv("ATS_ENCODER_THREADS", "0"))
+
+
+class SentenceTransformerEncoder:
+    """sentence-transformers model on PyTorch (CPU unless a GPU is available)"""
+
+    backend = "torch"
+
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', threads: int = None):
+        """
+        Args:
+            model_name: sentence-transformers model name or path
+            threads: torch intra-op threads (0 keeps torch's default)
+        """
+        from sentence_transformers import SentenceTransformer
+
+        threads = _thread_setting(threads)
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        # Unchanged from before backends existed, so existing caches stay valid
+        self.cache_name = model_name
+
+    def encode(
+        self,
+        sentences: list,
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        return self.model.encode(
+            sentences,
+            batch_size=batch_size,
+            convert_to_numpy=convert_to_numpy,
+            normalize_embeddings=normalize_embeddings
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+
+class OnnxEncoder:
+    """
+    sentence-transformers model exported to ONNX and run with onnxruntime.
+
+    The transformer is exported once (fp32, plus an int8 copy made with
+    onnxruntime's dynamic quantization when quantize=True); tokenization
+    uses the model's fast tokenizer through the tokenizers package and
+    mean pooling is done in numpy, matching sentence-transformers.
+    """
+
+    FORMAT_VERSION = 2
+    INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+    # Lowest cosine similarity to the PyTorch embedding allowed on any probe
+    MIN_COSINE = {"onnx": 0.9999, "onnx-int8": 0.98}
+
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        quantize: bool = False,
+        cache_dir: str = None,
+        intra_op_threads: int = None,
+        inter_op_threads: int = 1
+    ):
+        """
+        Args:
+            model_name: sentence-transformers model name or path
+            quantize: Run the int8 dynamically quantized export
+            cache_dir: Where exports are stored (defaults to ATS_CACHE_DIR or .cache/)
+            intra_op_threads: Threads per operator (0 lets onnxruntime use all cores)
+            inter_op_threads: Threads running independent operators in parallel
+
+        Raises:
+            ImportError: If onnxruntime or tokenizers is not installed
+            ValueError: If the export's embeddings don't match PyTorch's within MIN_COSINE
+        """
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX encoder requires the onnxruntime and tokenizers packages"
+            ) from e
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.backend = "onnx-int8" if quantize else "onnx"
+        self.cache_name = f"{model_name}+{self.backend}"
+
+        slug = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name)
+        base_dir = Path(cache_dir or os.getenv("ATS_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.export_dir = base_dir / "onnx" / slug
+
+        self.meta = self._load_or_export()
+
+        self.tokenizer = Tokenizer.from_file(str(self.export_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.meta["max_length"])
+        self.tokenizer.enable_padding(pad_id=self.meta["pad_id"], pad_token=self.meta["pad_token"])
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = _thread_setting(intra_op_threads)
+        options.inter_op_num_threads = inter_op_threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        model_file = "model.int8.onnx" if quantize else "model.onnx"
+        self.session = onnxruntime.InferenceSession(
+            str(self.export_dir / model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = [i.name for i in self.session.get_inputs()]
+        self.parity = self._check_parity()
+
+    # ------------------ Export ------------------
+    def _load_or_export(self) -> dict:
+        """Read the export metadata, exporting (and quantizing) whatever is missing"""
+        meta_path = self.export_dir / "meta.json"
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("format") != self.FORMAT_VERSION or meta.get("model") != self.model_name:
+                meta = None
+            elif not all((self.export_dir / name).exists() for name in ("model.onnx", "parity.npy")):
+                meta = None
+        except (OSError, ValueError):
+            meta = None
+
+        if meta is None:
+            meta = self._export()
+            self._write_atomic(meta_path, lambda tmp: Path(tmp).write_text(json.dumps(meta), encoding="utf-8"))
+
+        if self.quantize and not (self.export_dir / "model.int8.onnx").exists():
+            self._quantize()
+        return meta
+
+    def _write_atomic(self, path: Path, write):
+        """Call write(tmp_path), then move the result into place so other workers never see partial files"""
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.export_dir, suffix=".tmp" + path.suffix)
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _export(self) -> dict:
+        """Export the model's transformer to ONNX with dynamic batch and sequence axes"""
+        import torch
+        from sentence_transformers import SentenceTransformer
+        from sentence_transformers.models import Normalize, Pooling
+
+        print(f"📦 Exporting {self.model_name} to ONNX...")
+        model = SentenceTransformer(self.model_name, device="cpu")
+        transformer = model[0]
+        pooling = next((m for m in model if isinstance(m, Pooling)), None)
+        if pooling is None or not self._mean_pooling(pooling.get_config_dict()):
+            raise ValueError(f"{self.model_name} does not use mean pooling, which the ONNX encoder implements")
+
+        tokenizer = transformer.tokenizer
+        if not tokenizer.is_fast:
+            raise ValueError(f"{self.model_name} has no fast tokenizer to export")
+
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = [name for name in self.INPUT_NAMES if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+
+        # Newer torch defaults to the dynamo exporter, which needs onnxscript;
+        # the TorchScript exporter handles dynamic_axes on every version
+        legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+        class HiddenStates(torch.nn.Module):
+            """Takes the inputs positionally, by name order, since forward() signatures vary across transformers releases"""
+
+            def __init__(self, auto_model):
+                super().__init__()
+                self.auto_model = auto_model
+
+            def forward(self, *inputs):
+                return self.auto_model(**dict(zip(input_names, inputs))).last_hidden_state
+
+        wrapped = HiddenStates(transformer.auto_model).eval()
+        with torch.no_grad():
+            self._write_atomic(self.export_dir / "model.onnx", lambda tmp: torch.onnx.export(
+                wrapped,
+                tuple(sample[name] for name in input_names),
+                tmp,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+                do_constant_folding=True,
+                **legacy
+            ))
+        self._write_atomic(self.export_dir / "tokenizer.json", tokenizer.backend_tokenizer.save)
+        reference = model.encode(PARITY_PROBES, convert_to_numpy=True, normalize_embeddings=True)
+        self._write_atomic(self.export_dir / "parity.npy", lambda tmp: np.save(tmp, reference.astype(np.float32)))
+
+        print("✅ ONNX export ready")
+        return {
+            "format": self.FORMAT_VERSION,
+            "model": self.model_name,
+            "dim": model.get_sentence_embedding_dimension(),
+            "max_length": transformer.max_seq_length,
+            "pad_id": tokenizer.pad_token_id,
+            "pad_token": tokenizer.pad_token,
+            "normalize": any(isinstance(m, Normalize) for m in model),
+        }
+
+    @staticmethod
+    def _mean_pooling(config: dict) -> bool:
+        """Whether a Pooling config is plain mean pooling (sentence-transformers 6 has pooling_mode, older releases flags)"""
+        if "pooling_mode" in config:
+            return config["pooling_mode"] == "mean"
+        modes = [key for key, enabled in config.items() if key.startswith("pooling_mode_") and enabled is True]
+        return modes == ["pooling_mode_mean_tokens"]
+
+    def _quantize(self):
+        """Dynamic int8 quantization of the weights (activations stay float)"""
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print("📦 Quantizing ONNX model to int8...")
+        self._write_atomic(self.export_dir / "model.int8.onnx", lambda tmp: quantize_dynamic(
+            str(self.export_dir / "model.onnx"), tmp, weight_type=QuantType.QInt8
+        ))
+
+    def _check_parity(self) -> float:
+        """
+        Lowest cosine similarity between this encoder's and PyTorch's
+        embeddings of PARITY_PROBES.
+
+        Raises:
+            ValueError: If it is below MIN_COSINE for this backend
+        """
+        reference = np.load(self.export_dir / "parity.npy")
+        embeddings = self.encode(PARITY_PROBES, normalize_embeddings=True)
+        parity = float(np.min(np.sum(embeddings * reference, axis=1)))
+        if parity < self.MIN_COSINE[self.backend]:
+            raise ValueError(
+                f"{self.backend} export of {self.model_name} diverges from PyTorch "
+                f"(cosine {parity:.4f} < {self.MIN_COSINE[self.backend]}); use the torch backend"
+            )
+        return parity
+
+    # ------------------ Inference ------------------
+    def _encode_batch(self, sentences: list) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(sentences)
+        arrays = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(["last_hidden_state"], {name: arrays[name] for name in self._inputs})[0]
+
+        # Mean pooling over real (non-padding) tokens
+        mask = arrays["attention_mask"][..., None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(
+        self,
+        sentences: list,
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        """
+        Embed sentences, same contract as SentenceTransformer.encode.
+
+        Sentences are batched in length order so padding stays short, then
+        returned in input order.
+        """
+        dim = self.meta["dim"]
+        if not sentences:
+            return np.empty((0, dim), dtype=np.float32)
+
+        order = np.argsort([-len(s) for s in sentences], kind="stable")
+        embeddings = np.empty((len(sentences), dim), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            idx = order[start:start + batch_size]
+            embeddings[idx] = self._encode_batch([sentences[i] for i in idx])
+
+        if normalize_embeddings or self.meta["normalize"]:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.meta["dim"]
+
+
+ENCODER_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def get_encoder(model_name: str = 'all-MiniLM-L6-v2', backend: str = None, threads: int = None):
+    """
+    Return an encoder for model_name.
+
+    Args:
+        model_name: sentence-transformers model name or path
+        backend: "torch", "onnx" or "onnx-int8" (defaults to ATS_ENCODER_BACKEND, else torch)
+        threads: Intra-op threads (defaults to ATS_ENCODER_THREADS)
+
+    Raises:
+        ValueError: If backend is unknown
+    """
+    backend = backend or os.getenv("ATS_ENCODER_BACKEND", "torch")
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}', choose from {list(ENCODER_BACKENDS)}")
+    if backend == "torch":
+        return SentenceTransformerEncoder(model_name, threads)
+    return OnnxEncoder(model_name, quantize=backend == "onnx-int8", intra_op_threads=threads)
@@ -0,0 +1,34 @@
+"""
+Advisory inter-process lock for on-disk stores shared by several API workers.
+"""
+
+from contextlib import contextmanager
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on path + ".lock" for the duration of the block.
+
+    Blocks until no other process (or thread using its own lock) holds it.
+    """
+    lock_path = Path(f"{path}.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
@@ -0,0 +1,157 @@
+"""
+HTML parser backends for DescriptionScraper.
+Each backend runs the job-description selector cascade and returns the
+text blocks it found; the scraper joins and normalizes them.
+"""
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; fall back to BeautifulSoup
+    lxml_html = None
+
+# Tried in order; the first selector with any match wins
+JD_SELECTORS = [
+    "div.jobDescriptionText",
+    "div.description",
+    "section.jobDescription",
+    "div[data-job-description]",
+    "div#jobDescriptionText",
+]
+
+# Elements whose text BeautifulSoup's get_text() leaves out
+_SKIP_TEXT_TAGS = {"script", "style", "template"}
+
+
+class Bs4Backend:
+    """Pure-Python backend using BeautifulSoup's html.parser"""
+
+    name = "html.parser"
+
+    def extract_blocks(self, html: str) -> list:
+        soup = BeautifulSoup(html, "html.parser")
+
+        text_blocks = []
+        for selector in JD_SELECTORS:
+            elements = soup.select(selector)
+            if elements:
+                for el in elements:
+                    text_blocks.append(el.get_text(separator=" ", strip=True))
+                break
+
+        if not text_blocks:
+            candidates = soup.find_all(
+                lambda tag: tag.name == "div"
+                and tag.get("class")
+                and any("description" in c.lower() for c in tag["class"])
+            )
+            for c in candidates:
+                text_blocks.append(c.get_text(separator=" ", strip=True))
+
+        # --- Final fallback: grab all paragraphs ---
+        if not text_blocks:
+            text_blocks = [p.get_text(separator=" ", strip=True) for p in soup.find_all("p")]
+
+        return text_blocks
+
+
+class LxmlBackend:
+    """
+    C-based backend using lxml.html.
+
+    Every level of the cascade (the five selectors, description-class divs
+    and the <p> fallback) is collected in a single pass over the tree.
+    """
+
+    name = "lxml"
+
+    def _parse(self, html: str):
+        try:
+            return lxml_html.document_fromstring(html)
+        except ValueError:
+            # Strings carrying an XML encoding declaration must be passed as bytes
+            return lxml_html.document_fromstring(html.encode("utf-8"))
+
+    def _element_text(self, el) -> str:
+        """Same output as BeautifulSoup's get_text(separator=" ", strip=True)"""
+        parts = []
+        stack = [el]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+                continue
+            # Comments and processing instructions have non-string tags
+            if not isinstance(node.tag, str) or node.tag in _SKIP_TEXT_TAGS:
+                continue
+            if node.text:
+                parts.append(node.text)
+            for child in reversed(node):
+                if child.tail:
+                    stack.append(child.tail)
+                stack.append(child)
+        return " ".join(s for s in (p.strip() for p in parts) if s)
+
+    def extract_blocks(self, html: str) -> list:
+        try:
+            root = self._parse(html)
+        except etree.ParserError:
+            return []
+
+        selector_hits = [[] for _ in JD_SELECTORS]
+        description_divs = []
+        paragraphs = []
+
+        for el in root.iter("div", "section", "p"):
+            tag = el.tag
+            if tag == "p":
+                paragraphs.append(el)
+                continue
+
+            classes = (el.get("class") or "").split()
+            if tag == "section":
+                if "jobDescription" in classes:
+                    selector_hits[2].append(el)
+                continue
+
+            if "jobDescriptionText" in classes:
+                selector_hits[0].append(el)
+            if "description" in classes:
+                selector_hits[1].append(el)
+            if el.get("data-job-description") is not None:
+                selector_hits[3].append(el)
+            if el.get("id") == "jobDescriptionText":
+                selector_hits[4].append(el)
+            if any("description" in c.lower() for c in classes):
+                description_divs.append(el)
+
+        for hits in selector_hits:
+            if hits:
+                return [self._element_text(el) for el in hits]
+        if description_divs:
+            return [self._element_text(el) for el in description_divs]
+        return [self._element_text(p) for p in paragraphs]
+
+
+BACKENDS = {
+    Bs4Backend.name: Bs4Backend,
+    LxmlBackend.name: LxmlBackend,
+}
+
+
+def get_backend(name: str = None):
+    """
+    Return a parser backend instance, defaulting to lxml when it is installed.
+
+    Args:
+        name: "lxml" or "html.parser"
+    """
+    if name is None:
+        name = LxmlBackend.name if lxml_html is not None else Bs4Backend.name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend '{name}', choose from {sorted(BACKENDS)}")
+    if name == LxmlBackend.name and lxml_html is None:
+        raise ValueError("The lxml backend requires the lxml package")
+    return BACKENDS[name]()
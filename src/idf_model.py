@@ -0,0 +1,193 @@
+"""
+Corpus-level IDF weights for keyword scoring.
+The vocabulary and IDF vector are built once, from the token frequency
+distribution shipped in token_dist.json or from a local corpus, and persisted
+so each score is a sparse transform plus dot product instead of fitting a new
+vectorizer on two documents.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from src.embedding_cache import DEFAULT_CACHE_DIR
+
+TOKEN_DIST_PATH = Path(__file__).resolve().parent.parent / "token_dist.json"
+
+
+def _token_dist_source(raw: bytes, n_documents: int = None) -> str:
+    return f"token_dist:{hashlib.sha256(raw).hexdigest()[:16]}:{n_documents}"
+
+
+class IdfModel:
+    """
+    Fixed vocabulary with smoothed IDF weights (same formula as scikit-learn:
+    idf = ln((1 + n_documents) / (1 + df)) + 1).
+
+    Tokens outside the vocabulary are hashed into oov_buckets extra columns
+    and weighted as unseen terms, so words the corpus never saw still count.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, tokens: list, idf: np.ndarray, n_documents: int, source: str = "", oov_buckets: int = 2 ** 18):
+        """
+        Args:
+            tokens: Vocabulary, in column order
+            idf: IDF weight per vocabulary token
+            n_documents: Corpus size the weights were computed for
+            source: Fingerprint of the data the model was built from
+            oov_buckets: Hashed columns for out-of-vocabulary tokens
+        """
+        self.tokens = list(tokens)
+        self.vocabulary = {token: i for i, token in enumerate(self.tokens)}
+        self.n_documents = int(n_documents)
+        self.source = source
+        self.oov_buckets = oov_buckets
+
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.oov_idf = np.float32(np.log(1 + self.n_documents) + 1)
+        self._weights = np.concatenate([self.idf, np.full(oov_buckets, self.oov_idf, dtype=np.float32)])
+
+    @property
+    def n_features(self) -> int:
+        return len(self.tokens) + self.oov_buckets
+
+    # ------------------ Building ------------------
+    @classmethod
+    def from_frequencies(cls, frequencies: dict, n_documents: int = None, source: str = "") -> "IdfModel":
+        """
+        Build from token -> document frequency counts.
+
+        Args:
+            frequencies: Document frequency per token
+            n_documents: Corpus size; defaults to the largest frequency, i.e.
+                         the most common token is taken to appear in every document
+        """
+        tokens = sorted(frequencies)
+        df = np.array([frequencies[t] for t in tokens], dtype=np.float64)
+        if n_documents is None:
+            n_documents = int(df.max()) if len(df) else 0
+        idf = np.log((1 + n_documents) / (1 + df)) + 1
+        return cls(tokens, idf, n_documents, source)
+
+    @classmethod
+    def from_token_dist(cls, path: str = None, n_documents: int = None) -> "IdfModel":
+        """Build from the repo's token_dist.json frequency distribution"""
+        raw = Path(path or TOKEN_DIST_PATH).read_bytes()
+        return cls.from_frequencies(json.loads(raw), n_documents, _token_dist_source(raw, n_documents))
+
+    @classmethod
+    def from_corpus(cls, documents: list, min_df: int = 1) -> "IdfModel":
+        """
+        Build from a local corpus of cleaned documents (whitespace-separated tokens).
+        """
+        counter = CountVectorizer(token_pattern=r"\S+", lowercase=False, binary=True, min_df=min_df)
+        presence = counter.fit_transform(documents)
+        df = np.asarray(presence.sum(axis=0)).ravel()
+        frequencies = dict(zip(counter.get_feature_names_out(), df.tolist()))
+        return cls.from_frequencies(frequencies, n_documents=len(documents), source=f"corpus:{len(documents)}")
+
+    # ------------------ Persistence ------------------
+    def save(self, path: str):
+        """Write the model as .npz atomically so concurrent workers never see partial files"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".npz.tmp", delete=False) as tmp:
+            np.savez(
+                tmp,
+                format=self.FORMAT_VERSION,
+                tokens=np.array(self.tokens, dtype=str),
+                idf=self.idf,
+                n_documents=self.n_documents,
+                source=self.source,
+                oov_buckets=self.oov_buckets,
+            )
+        os.replace(tmp.name, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IdfModel":
+        """
+        Raises:
+            ValueError: If the file was written by an incompatible version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format"]) != cls.FORMAT_VERSION:
+                raise ValueError(f"Unsupported IDF model format in {path}")
+            return cls(
+                data["tokens"].tolist(),
+                data["idf"],
+                int(data["n_documents"]),
+                str(data["source"]),
+                int(data["oov_buckets"]),
+            )
+
+    @classmethod
+    def load_or_build(cls, path: str = None, token_dist_path: str = None, n_documents: int = None) -> "IdfModel":
+        """
+        Load the persisted model, rebuilding it from token_dist.json when it
+        is missing, unreadable or was built from a different distribution.
+
+        Args:
+            path: Model file (defaults to ATS_IDF_MODEL or .cache/idf_model.npz)
+            token_dist_path: Frequency distribution to build from
+            n_documents: Corpus size passed to from_token_dist
+        """
+        path = Path(path or os.getenv("ATS_IDF_MODEL", DEFAULT_CACHE_DIR / "idf_model.npz"))
+        token_dist_path = Path(token_dist_path or TOKEN_DIST_PATH)
+        source = _token_dist_source(token_dist_path.read_bytes(), n_documents)
+
+        try:
+            cached = cls.load(path)
+            if cached.source == source:
+                return cached
+        except (OSError, ValueError, KeyError):
+            pass
+
+        model = cls.from_token_dist(token_dist_path, n_documents)
+        try:
+            model.save(path)
+            print(f"📦 Saved IDF model ({len(model.tokens)} tokens) to {path}")
+        except OSError as e:
+            print(f"⚠️ Could not persist IDF model: {e}")
+        return model
+
+    # ------------------ Scoring ------------------
+    def column(self, token: str) -> int:
+        """Feature column of a token (a hashed OOV bucket if it isn't in the vocabulary)"""
+        index = self.vocabulary.get(token)
+        if index is None:
+            index = len(self.tokens) + zlib.crc32(token.encode("utf-8")) % self.oov_buckets
+        return index
+
+    def transform(self, documents: list) -> sparse.csr_matrix:
+        """
+        L2-normalized TF-IDF rows for tokenized documents.
+
+        Args:
+            documents: One list of tokens per document
+
+        Returns:
+            CSR matrix of shape (len(documents), n_features)
+        """
+        rows = []
+        cols = []
+        for i, tokens in enumerate(documents):
+            rows.extend([i] * len(tokens))
+            cols.extend(self.column(token) for token in tokens)
+
+        counts = sparse.csr_matrix(
+            (np.ones(len(cols), dtype=np.float32), (rows, cols)),
+            shape=(len(documents), self.n_features),
+        )
+        counts.sum_duplicates()
+        counts.data *= self._weights[counts.indices]
+        return normalize(counts, norm="l2", copy=False)
@@ -1,65 +1,248 @@
 import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import asyncio
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
 import re
 
+from src.cache import LRUCache
+from src.html_backends import get_backend
+from src.metrics import timed, count
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/125.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+class ScrapeError(Exception):
+    """Fetching or extracting a job description failed"""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
 
 class DescriptionScraper:
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 10.0,
+        total_timeout: float = 20.0,
+        max_connections: int = 100,
+        max_connections_per_host: int = 8,
+        cache_ttl: float = 3600.0,
+        cache_size: int = 512,
+        parser_backend: str = None
+    ):
+        """
+        Args:
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait between reads of the response
+            total_timeout: Overall seconds per request (async path)
+            max_connections: Pooled connection limit for the async client
+            max_connections_per_host: Per-host connection limit for the async client
+            cache_ttl: Seconds a scraped JD is served from cache before revalidating
+            cache_size: Maximum number of cached URLs
+            parser_backend: "lxml" (default when installed) or "html.parser"
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.cache_ttl = cache_ttl
+        self._cache = LRUCache(cache_size)
+        self._session = None
+        self._inflight = {}
+        self.backend = get_backend(parser_backend)
+
+    def extract_text(self, html: str) -> str:
+        """Extract job description text from a page using the selector cascade"""
+        with timed("scrape.extract"):
+            text_blocks = self.backend.extract_blocks(html)
+
+            jd_text = " ".join(text_blocks)
+            jd_text = re.sub(r"\s+", " ", jd_text).strip()
+            return jd_text[:5000]
 
     def jd_scraper(self, desc_link: str) -> str:
         """Scrapes the job description text from the provided URL"""
         try:
-            headers = {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/125.0 Safari/537.36"
-                ),
-                "Accept-Language": "en-US,en;q=0.9",
-            }
-            response = requests.get(desc_link, headers=headers)
+            with timed("scrape.fetch"):
+                response = requests.get(
+                    desc_link,
+                    headers=HEADERS,
+                    timeout=(self.connect_timeout, self.read_timeout)
+                )
             if response.status_code != 200:
                 print(f"Failed to retrieve content. Status code: {response.status_code}")
+                count("scrape.error")
                 return ""
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            possible_selectors = [
-                "div.jobDescriptionText",
-                "div.description",
-                "section.jobDescription",
-                "div[data-job-description]",
-                "div#jobDescriptionText",
-            ]
-
-            text_blocks = []
-            for selector in possible_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    for el in elements:
-                        text_blocks.append(el.get_text(separator=" ", strip=True))
-                    break
-
-            if not text_blocks:
-                candidates = soup.find_all(
-                    lambda tag: tag.name == "div"
-                    and tag.get("class")
-                    and any("description" in c.lower() for c in tag["class"])
-                )
-                for c in candidates:
-                    text_blocks.append(c.get_text(separator=" ", strip=True))
-
-            # --- Final fallback: grab all paragraphs ---
-            if not text_blocks:
-                text_blocks = [p.get_text(separator=" ", strip=True) for p in soup.find_all("p")]
-
-            jd_text = " ".join(text_blocks)
-            jd_text = re.sub(r"\s+", " ", jd_text).strip()
 
+            jd_text = self.extract_text(response.text)
             print(f"✅ Extracted JD length: {len(jd_text)} chars")  # debug
-            return jd_text[:5000]
+            return jd_text
 
         except Exception as e:
             print(f"An error occurred while scraping: {e}")
+            count("scrape.error")
             return ""
+
+    # ------------------ Async path ------------------
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=300,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=self.total_timeout,
+                sock_connect=self.connect_timeout,
+                sock_read=self.read_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS)
+        return self._session
+
+    async def _fetch(self, desc_link: str, cached: dict) -> str:
+        """GET the page, revalidating a stale cache entry via ETag/Last-Modified"""
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            with timed("scrape.fetch"):
+                async with self._get_session().get(desc_link, headers=headers) as response:
+                    if response.status == 304 and cached:
+                        count("scrape.not_modified")
+                        self._cache.set(desc_link, {**cached, "fetched_at": time.monotonic()})
+                        return cached["text"]
+                    if response.status != 200:
+                        raise ScrapeError(f"Failed to retrieve content. Status code: {response.status}", response.status)
+
+                    html = await response.text(errors="replace")
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+        except asyncio.TimeoutError:
+            raise ScrapeError("Timed out fetching the job description")
+        except (aiohttp.ClientError, ValueError) as e:
+            raise ScrapeError(f"An error occurred while scraping: {e}")
+
+        # HTML parsing is CPU-bound; keep it off the event loop
+        jd_text = await asyncio.to_thread(self.extract_text, html)
+        if not jd_text:
+            raise ScrapeError("Failed to extract job description", 200)
+
+        self._cache.set(desc_link, {
+            "text": jd_text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.monotonic(),
+        })
+        return jd_text
+
+    def _fetch_done(self, desc_link: str, task: asyncio.Task):
+        self._inflight.pop(desc_link, None)
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled() and task.exception() is not None:
+            count("scrape.error")
+
+    async def fetch_jd(self, desc_link: str) -> str:
+        """
+        Scrape a job description with the pooled async client.
+
+        Fresh cache entries are returned without a request; concurrent calls
+        for the same URL share one fetch.
+
+        Raises:
+            ScrapeError: If the page can't be fetched or has no JD text
+        """
+        cached = self._cache.get(desc_link)
+        if cached and time.monotonic() - cached["fetched_at"] < self.cache_ttl:
+            count("scrape.cache_hit")
+            return cached["text"]
+
+        task = self._inflight.get(desc_link)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(desc_link, cached))
+            self._inflight[desc_link] = task
+            task.add_done_callback(lambda t: self._fetch_done(desc_link, t))
+
+        # Shield so one cancelled caller doesn't cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def jd_scraper_async(self, desc_link: str) -> str:
+        """Async version of jd_scraper: returns "" on failure"""
+        try:
+            jd_text = await self.fetch_jd(desc_link)
+            print(f"✅ Extracted JD length: {len(jd_text)} chars")  # debug
+            return jd_text
+        except ScrapeError as e:
+            print(e)
+            return ""
+
+    async def scrape_many(self, urls: list, concurrency: int = 10, per_domain: int = 2):
+        """
+        Scrape many job links concurrently, yielding each result as it completes.
+        
+        Args:
+            urls: Job description URLs
+            concurrency: Maximum fetches in flight overall
+            per_domain: Maximum fetches in flight per domain
+        
+        Yields:
+            Dicts with index, url, status ("success"/"error") and either
+            job_description or message (plus http_status when known)
+        """
+        global_slots = asyncio.Semaphore(concurrency)
+        domain_slots = defaultdict(lambda: asyncio.Semaphore(per_domain))
+
+        async def scrape_one(index: int, url: str) -> dict:
+            domain = (urlsplit(url).hostname or "").lower()
+            # Take the domain slot first so a busy domain doesn't hold global slots
+            async with domain_slots[domain], global_slots:
+                try:
+                    jd_text = await self.fetch_jd(url)
+                    return {"index": index, "url": url, "status": "success", "job_description": jd_text}
+                except ScrapeError as e:
+                    return {
+                        "index": index,
+                        "url": url,
+                        "status": "error",
+                        "message": str(e),
+                        "http_status": e.status
+                    }
+                except Exception as e:
+                    # e.g. a parser error on malformed HTML; must not end the whole batch
+                    print(f"An error occurred while scraping {url}: {e}")
+                    return {
+                        "index": index,
+                        "url": url,
+                        "status": "error",
+                        "message": f"An error occurred while scraping: {e}",
+                        "http_status": None
+                    }
+
+        tasks = [asyncio.create_task(scrape_one(i, url)) for i, url in enumerate(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away or caller stopped early
+            for task in tasks:
+                task.cancel()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,225 @@
+"""
+In-process latency histograms and counters for the scoring pipeline.
+
+Stages are wrapped in ``timed("name")``; durations go into a Prometheus
+histogram (rendered by the API at /metrics) and, inside an HTTP request
+that asked for it, into that request's Server-Timing header.
+
+ATS_METRICS_SAMPLE_RATE (default 1.0) is the fraction of stage timings
+recorded; at 0 timed() returns a shared no-op context manager, so
+instrumented code pays one function call per stage.
+"""
+
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+import os
+import random
+import threading
+import time
+
+# Seconds; chosen to cover sub-millisecond lexical stages up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+_sample_rate = float(os.getenv("ATS_METRICS_SAMPLE_RATE", "1.0"))
+
+# Per-request list of (stage, seconds) while a Server-Timing header is being collected
+_request_timings = ContextVar("request_timings", default=None)
+
+_NULL_TIMER = nullcontext()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)"""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Named histograms and counters, each keyed by a label set.
+    Safe to share between FastAPI worker threads.
+    """
+
+    def __init__(self):
+        self._histograms = {}   # name -> {labels: Histogram}
+        self._counters = {}     # name -> {labels: float}
+        self._help = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def register_collector(self, collect):
+        """
+        Add a callback evaluated at render time, returning a list of
+        (name, type, help, value, labels dict) samples, e.g. queue gauges.
+        """
+        self._collectors.append(collect)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum!r}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value!r}")
+
+        described = set()
+        for collect in self._collectors:
+            for name, metric_type, help_text, value, labels in collect():
+                if name not in described:
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    described.add(name)
+                lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value!r}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("ats_stage_duration_seconds", "Time spent in each pipeline stage")
+REGISTRY.describe("ats_events_total", "Pipeline events such as cache hits and errors")
+REGISTRY.describe("ats_http_request_duration_seconds", "HTTP request latency by route")
+
+
+def set_sample_rate(rate: float):
+    """Fraction of stage timings to record (0 disables timing entirely)"""
+    global _sample_rate
+    _sample_rate = max(0.0, min(1.0, rate))
+
+
+def _sampled() -> bool:
+    return _sample_rate >= 1.0 or (_sample_rate > 0.0 and random.random() < _sample_rate)
+
+
+class _Timer:
+    __slots__ = ("stage", "record", "timings", "start")
+
+    def __init__(self, stage: str, record: bool, timings: list):
+        self.stage = stage
+        self.record = record
+        self.timings = timings
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.record:
+            REGISTRY.observe("ats_stage_duration_seconds", elapsed, stage=self.stage)
+        if self.timings is not None:
+            self.timings.append((self.stage, elapsed))
+        return False
+
+
+def timed(stage: str):
+    """
+    Context manager timing a pipeline stage.
+
+    Usage:
+        with timed("skills.fuzzy"):
+            ...
+    """
+    timings = _request_timings.get()
+    record = _sample_rate > 0.0 and _sampled()
+    if not record and timings is None:
+        return _NULL_TIMER
+    return _Timer(stage, record, timings)
+
+
+def observe(stage: str, seconds: float):
+    """Record a duration that was measured elsewhere (e.g. queue wait)"""
+    timings = _request_timings.get()
+    if _sample_rate > 0.0 and _sampled():
+        REGISTRY.observe("ats_stage_duration_seconds", seconds, stage=stage)
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+def count(event: str, amount: float = 1):
+    """Increment an event counter (always on: a dict update under a lock)"""
+    REGISTRY.inc("ats_events_total", amount, event=event)
+
+
+# ------------------ Server-Timing ------------------
+def start_request_timings():
+    """Collect stage timings for the current request; returns a token for finish_request_timings"""
+    return _request_timings.set([])
+
+
+def finish_request_timings(token) -> list:
+    timings = _request_timings.get()
+    _request_timings.reset(token)
+    return timings or []
+
+
+def server_timing_header(timings: list, total: float = None) -> str:
+    """Server-Timing value with durations in ms, summing repeated stages"""
+    totals = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    if total is not None:
+        totals["total"] = total
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in totals.items())
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
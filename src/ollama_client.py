@@ -0,0 +1,178 @@
+"""
+Pooled async client for the local Ollama server.
+Generations go through a bounded queue: at most max_in_flight requests hit
+the model at once, at most max_queue wait behind them, and anything beyond
+that is rejected immediately instead of piling up on the model server.
+"""
+
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from src.metrics import observe
+
+
+class QueueFullError(Exception):
+    """The generation queue is at capacity"""
+
+
+class OllamaError(Exception):
+    """Ollama answered with a non-200 status"""
+
+    def __init__(self, status: int):
+        super().__init__(f"Ollama API error: {status}")
+        self.status = status
+
+
+class _Timing:
+    """Running count/total/max of a duration in seconds"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class OllamaClient:
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        max_in_flight: int = 2,
+        max_queue: int = 16,
+        timeout: float = 90.0,
+        connect_timeout: float = 5.0
+    ):
+        """
+        Args:
+            base_url: Ollama server URL
+            max_in_flight: Generations running on the model at once
+            max_queue: Generations allowed to wait for a free slot
+            timeout: Seconds between reads of a generation response
+            connect_timeout: Seconds to connect to Ollama
+        """
+        self.base_url = base_url
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+        self._session = None
+        self._slots = None
+        self._waiting = 0
+        self._in_flight = 0
+        self.rejected = 0
+        self.queue_wait = _Timing()
+        self.generation = _Timing()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight + 2)
+            timeout = aiohttp.ClientTimeout(
+                total=None, sock_connect=self.connect_timeout, sock_read=self.timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    def ensure_capacity(self):
+        """Raise QueueFullError if a new generation would be rejected right now"""
+        if self._in_flight >= self.max_in_flight and self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(
+                f"Generation queue is full ({self._in_flight} running, {self._waiting} waiting)"
+            )
+
+    @asynccontextmanager
+    async def _slot(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+        self.ensure_capacity()
+        self._waiting += 1
+        start = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - start
+        self.queue_wait.observe(waited)
+        observe("ollama.queue_wait", waited)
+
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+            elapsed = time.perf_counter() - start
+            self.generation.observe(elapsed)
+            observe("ollama.generation", elapsed)
+
+    async def generate(self, payload: dict) -> dict:
+        """
+        Run a non-streaming /api/generate request.
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+            OllamaError: On a non-200 response
+        """
+        async with self._slot():
+            async with self._get_session().post(
+                f"{self.base_url}/api/generate", json={**payload, "stream": False}
+            ) as response:
+                if response.status != 200:
+                    raise OllamaError(response.status)
+                return await response.json(content_type=None)
+
+    async def generate_stream(self, payload: dict):
+        """
+        Run a streaming /api/generate request, yielding each JSON chunk.
+        Closing the generator early closes the connection, which stops generation.
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+            OllamaError: On a non-200 response
+        """
+        async with self._slot():
+            async with self._get_session().post(
+                f"{self.base_url}/api/generate", json={**payload, "stream": True}
+            ) as response:
+                if response.status != 200:
+                    raise OllamaError(response.status)
+                async for line in response.content:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+
+    def metrics(self) -> dict:
+        """Queue depth and timing counters"""
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.as_dict(),
+            "generation": self.generation.as_dict(),
+        }
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -1,14 +1,173 @@
 from PyPDF2 import PdfReader
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator
+import asyncio
+import os
+import time
+
+from src.metrics import timed, observe
+
+
+class PdfTooLargeError(ValueError):
+    """Raised when a PDF exceeds the configured byte limit"""
+
+
+def _check_size(file_path: str, max_bytes: int = None):
+    if max_bytes is not None:
+        size = os.path.getsize(file_path)
+        if size > max_bytes:
+            raise PdfTooLargeError(f"PDF is {size} bytes, limit is {max_bytes}")
+
+
+def _page_count(reader: PdfReader, max_pages: int = None) -> int:
+    n_pages = len(reader.pages)
+    if max_pages is not None:
+        n_pages = min(n_pages, max_pages)
+    return n_pages
+
+
+def iter_pdf_pages(file_path: str, max_pages: int = None, max_bytes: int = None) -> Iterator[str]:
+    """Yield the text of each page as it is extracted, up to max_pages"""
+    _check_size(file_path, max_bytes)
+    reader = PdfReader(file_path)
+    for i in range(_page_count(reader, max_pages)):
+        yield reader.pages[i].extract_text()
+
+
+def _parse_page_range(file_path: str, start: int, end: int) -> list:
+    """Extract pages [start, end) (module-level so worker processes can run it)"""
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() for i in range(start, end)]
+
+
+def parse_pdf(file_path: str, max_pages: int = None, max_bytes: int = None) -> str:
+    """Extract text from the first max_pages pages of a PDF (module-level so worker processes can run it)"""
+    return " ".join(iter_pdf_pages(file_path, max_pages, max_bytes))
+
 
 class PdfParser():
-    def __init__(self):
-        pass
-    
-    def Resume_parse(self,file_path:str)->str:
-        reader=PdfReader(file_path)
-        text=[]
-        for i in range(len(reader.pages)):
-            page=reader.pages[i]
-            text.append(page.extract_text())
-        return " ".join(text)
-    
\ No newline at end of file
+    def __init__(self, max_pages: int = None, max_bytes: int = None):
+        """
+        Args:
+            max_pages: Default page cap for every parse mode
+            max_bytes: Maximum PDF file size; larger files raise PdfTooLargeError
+        """
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+
+    def Resume_parse(self, file_path: str, max_pages: int = None) -> str:
+        with timed("pdf.parse"):
+            return parse_pdf(file_path, max_pages or self.max_pages, self.max_bytes)
+
+    def iter_pages(self, file_path: str, max_pages: int = None) -> Iterator[str]:
+        """Streaming mode: yield page texts one by one so callers can start early"""
+        return iter_pdf_pages(file_path, max_pages or self.max_pages, self.max_bytes)
+
+    def parse_parallel(
+        self,
+        file_path: str,
+        workers: int = 4,
+        max_pages: int = None,
+        min_pages_per_worker: int = 8
+    ) -> str:
+        """
+        Parallel mode: split the page range across worker processes.
+
+        Each worker opens the PDF itself and extracts a contiguous range of
+        pages; results are joined in page order. Short documents are parsed
+        serially since process startup would dominate.
+        """
+        _check_size(file_path, self.max_bytes)
+        n_pages = _page_count(PdfReader(file_path), max_pages or self.max_pages)
+
+        workers = max(1, min(workers, n_pages // min_pages_per_worker))
+        if workers == 1:
+            return " ".join(_parse_page_range(file_path, 0, n_pages))
+
+        bounds = [n_pages * k // workers for k in range(workers + 1)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(_parse_page_range, [file_path] * workers, bounds[:-1], bounds[1:])
+            return " ".join(text for chunk in chunks for text in chunk)
+
+
+class PdfParsePool:
+    """
+    Runs PDF parsing in a bounded pool of worker processes so async endpoints
+    can await it without blocking the event loop.
+
+    Settings fall back to PDF_PARSE_WORKERS, PDF_PARSE_TIMEOUT (seconds),
+    PDF_MAX_PAGES and PDF_MAX_BYTES. The timeout only starts once a worker
+    slot is free, so queueing under load doesn't count against a document.
+    On timeout the request fails fast and the pool is replaced, killing the
+    stuck worker so a document that hangs the parser can't hold a slot.
+    Other parses that were running in the killed pool are retried once in
+    the new one.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        timeout: float = None,
+        max_pages: int = None,
+        max_bytes: int = None
+    ):
+        self.max_workers = max_workers or int(os.getenv("PDF_PARSE_WORKERS", "2"))
+        self.timeout = timeout or float(os.getenv("PDF_PARSE_TIMEOUT", "30"))
+        self.max_pages = max_pages or int(os.getenv("PDF_MAX_PAGES", "50"))
+        self.max_bytes = max_bytes or int(os.getenv("PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+        self._executor = None
+        self._slots = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so importing the API module doesn't fork workers
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def parse(self, file_path: str) -> str:
+        """
+        Parse a PDF in the process pool.
+
+        Raises:
+            PdfTooLargeError: If the file is larger than self.max_bytes
+            asyncio.TimeoutError: If parsing takes longer than self.timeout
+        """
+        # Reject oversized files before they take a worker slot
+        _check_size(file_path, self.max_bytes)
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        start = time.perf_counter()
+        async with self._slots:
+            observe("pdf.queue_wait", time.perf_counter() - start)
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                executor = self._get_executor()
+                future = loop.run_in_executor(executor, parse_pdf, file_path, self.max_pages)
+                try:
+                    with timed("pdf.parse"):
+                        return await asyncio.wait_for(future, timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    self._discard(executor, kill=True)
+                    raise
+                except BrokenProcessPool:
+                    # Killed by another request's timeout (or a crashed worker)
+                    self._discard(executor)
+                    if attempt:
+                        raise
+
+    def _discard(self, executor: ProcessPoolExecutor, kill: bool = False):
+        """Stop using executor; with kill=True, terminate its workers mid-parse"""
+        if self._executor is executor:
+            self._executor = None
+        if kill:
+            # ProcessPoolExecutor has no public way to stop a running task
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._discard(self._executor)
@@ -1,70 +1,171 @@
 import re
 import string
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
+import numpy as np
+from scipy import sparse
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 import nltk
 
+from src.idf_model import IdfModel
 from src.skill_extractor import KeyBertSkillExtractor
 
 nltk.download('stopwords')
 nltk.download('wordnet')
 
-class Resume_scorer:
+TAG_PATTERN = re.compile(r'<[^>]+>')
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+class _LemmaMemo:
+    """Raw token -> lemma ("" for dropped tokens) and its IdfModel column (-1)"""
+    
     def __init__(self):
+        self.token_lemmas = {}
+        self.token_columns = {}
+
+class Resume_scorer:
+    def __init__(self, idf_model: IdfModel = None, max_memo_tokens: int = 200_000):
+        """
+        Args:
+            idf_model: Corpus IDF weights for keyword scoring (defaults to the
+                       persisted model built from token_dist.json)
+            max_memo_tokens: Distinct tokens memoized before the lemma table
+                             is reset, bounding memory in a long-running process
+                             (one oversized batch may exceed it until the next reset)
+        """
         self.stop_words = set(stopwords.words('english'))
         self.lemmatizer = WordNetLemmatizer()
+        self.idf_model = idf_model or IdfModel.load_or_build()
         
+        # Memoized cleaning; replaced (never mutated by readers) when it gets too big
+        self.max_memo_tokens = max_memo_tokens
+        self._memo = _LemmaMemo()
+        self._lemma_lock = threading.Lock()
+    
     def clean_text(self, text: str) -> str:
         """Clean text: remove punctuation, stopwords, lowercase it, and lemmatize"""
-        text = text.lower()
-        text = re.sub(r'<[^>]+>', ' ', text)
-        text = text.translate(str.maketrans('', '', string.punctuation))
-        words = text.split()
-        words = [
-            self.lemmatizer.lemmatize(word)
-            for word in words if word not in self.stop_words and word.isalpha()
+        return self.clean_texts([text])[0]
+    
+    def _learn_tokens(self, tokens: set) -> _LemmaMemo:
+        """
+        Lemmatize tokens missing from the memo (each distinct token once) and record their columns.
+        
+        Returns:
+            The memo now holding every token in tokens (a fresh one if the
+            current memo would grow past max_memo_tokens)
+        """
+        with self._lemma_lock:
+            memo = self._memo
+            unseen = tokens.difference(memo.token_lemmas)
+            if len(memo.token_lemmas) + len(unseen) > self.max_memo_tokens:
+                # Start over rather than evict: readers holding the old memo keep using it
+                memo = self._memo = _LemmaMemo()
+                unseen = tokens
+            
+            for token in unseen:
+                if token in self.stop_words or not token.isalpha():
+                    memo.token_columns[token] = -1
+                    memo.token_lemmas[token] = ""
+                    continue
+                lemma = self.lemmatizer.lemmatize(token)
+                memo.token_columns[token] = self.idf_model.column(lemma)
+                # Written last: readers only look tokens up once this is set
+                memo.token_lemmas[token] = lemma
+            return memo
+    
+    def clean_texts(self, texts: list, return_ids: bool = False) -> list:
+        """
+        Batch clean_text: each distinct token in the batch is lemmatized once
+        and memoized for later batches.
+        
+        Args:
+            texts: Raw documents
+            return_ids: Return int32 arrays of the lemmas' self.idf_model
+                        feature columns instead of cleaned strings
+        
+        Returns:
+            One cleaned string (or column array) per document
+        """
+        tokenized = [
+            TAG_PATTERN.sub(' ', text.lower()).translate(PUNCTUATION_TABLE).split()
+            for text in texts
         ]
-        return " ".join(words)
+        
+        memo = self._memo
+        batch_tokens = set().union(*tokenized)
+        if not batch_tokens.issubset(memo.token_lemmas):
+            memo = self._learn_tokens(batch_tokens)
+        
+        if not return_ids:
+            lookup = memo.token_lemmas.__getitem__
+            return [" ".join(filter(None, map(lookup, tokens))) for tokens in tokenized]
+        
+        lookup = memo.token_columns.__getitem__
+        results = []
+        for tokens in tokenized:
+            ids = np.fromiter(map(lookup, tokens), dtype=np.int32, count=len(tokens))
+            results.append(ids[ids >= 0])
+        return results
     
+    @staticmethod
     def clean_resume_text(text):
         text = re.sub(r'[^A-Za-z0-9\s\+\#]', ' ', text)  # remove weird chars
         text = re.sub(r'\s+', ' ', text)
         return text.lower()
     
+    def vectorize(self, texts: list) -> sparse.csr_matrix:
+        """L2-normalized TF-IDF rows (corpus IDF weights) for raw texts"""
+        return self.idf_model.transform([self.clean_resume_text(t).split() for t in texts])
     
-    def compute_score(self, resume_text: str, jd_text: str):
-        resume_clean = self.clean_resume_text(resume_text)
-        jd_clean = self.clean_resume_text(jd_text)
+    def score_matrix(self, resume_vectors: sparse.csr_matrix, jd_text: str) -> np.ndarray:
+        """
+        Score already vectorized resumes against a JD in one sparse product.
         
-        vectorizer = TfidfVectorizer()
-        vectors = vectorizer.fit_transform([resume_clean, jd_clean])
+        Args:
+            resume_vectors: Rows from vectorize()
+            jd_text: Job description text
         
-        score = cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
-        ats_score = round(score * 100, 2)
+        Returns:
+            ATS score (0-100) per row
+        """
+        jd_vector = self.vectorize([jd_text])
+        # Rows are L2-normalized, so the dot product is the cosine similarity
+        scores = (resume_vectors @ jd_vector.T).toarray().ravel()
+        return np.round(scores * 100, 2)
+    
+    def compute_score(self, resume_text: str, jd_text: str):
+        return self.compute_score_batch([resume_text], jd_text)[0]
+    
+    def compute_score_batch(self, resume_texts: list, jd_text: str) -> list:
+        """
+        Keyword-score many resumes against one job description.
         
-        resume_words = set(resume_clean.split())
-        jd_words = set(jd_clean.split())
+        Returns:
+            One compute_score dict per resume, in input order
+        """
+        resume_tokens = [self.clean_resume_text(t).split() for t in resume_texts]
+        jd_tokens = self.clean_resume_text(jd_text).split()
         
-        matched_keywords = sorted(list(resume_words & jd_words))
-        missing_keywords = sorted(list(jd_words - resume_words))
+        vectors = self.idf_model.transform(resume_tokens + [jd_tokens])
+        scores = (vectors[:-1] @ vectors[-1].T).toarray().ravel()
         
-        return {
-            "ATS Score": ats_score,
-            "Matched Keywords": matched_keywords,
-            "Missing Keywords": missing_keywords
-        }
+        jd_words = set(jd_tokens)
+        results = []
+        for tokens, score in zip(resume_tokens, scores):
+            resume_words = set(tokens)
+            results.append({
+                "ATS Score": round(float(score) * 100, 2),
+                "Matched Keywords": sorted(resume_words & jd_words),
+                "Missing Keywords": sorted(jd_words - resume_words)
+            })
+        return results
 
 
 class ResumeScorerPro:
     def __init__(self):
         self.extractor = KeyBertSkillExtractor()
     
-    def resume_skill_score(self, resume_text: str, jd_text: str):
-        resume_skills = self.extractor.extract_skills(resume_text)
-        jd_skills = self.extractor.extract_skills(jd_text)
-        
+    def _skill_score(self, resume_skills: list, jd_skills: list) -> dict:
         matched_skills = [s for s in jd_skills if s in resume_skills]
         missing_skills = [s for s in jd_skills if s not in resume_skills]
         
@@ -77,3 +178,46 @@ class ResumeScorerPro:
             "Resume Skills": resume_skills,
             "Job Description Skills": jd_skills
         }
+    
+    def resume_skill_score(
+        self,
+        resume_text: str,
+        jd_text: str,
+        mode: str = "full",
+        time_budget_ms: float = None
+    ):
+        """
+        Args:
+            mode: Extraction mode, "fast", "balanced" or "full"
+            time_budget_ms: Optional budget shared by both extractions; when it
+                            runs out the remaining stages are skipped and the
+                            result is marked partial
+        """
+        # JD first so it gets the budget before the resume; one pooled SBERT encode
+        jd, resume = self.extractor.extract_skills_batch_detailed(
+            [jd_text, resume_text], mode=mode, time_budget_ms=time_budget_ms
+        )
+        
+        return {
+            **self._skill_score(resume["skills"], jd["skills"]),
+            "Extraction Mode": mode,
+            "Partial": jd["partial"] or resume["partial"]
+        }
+    
+    def resume_skill_score_batch(self, resume_texts: list, jd_text: str, batch_size: int = 32, mode: str = "full"):
+        """
+        Score many resumes against one job description.
+        
+        JD skills are extracted once. Resumes are processed in chunks of
+        batch_size, each chunk sharing one pooled SBERT encode, and results
+        are yielded as soon as their chunk finishes.
+        
+        Yields:
+            (resume index, score dict) tuples, in input order
+        """
+        jd_skills = self.extractor.extract_skills(jd_text, mode=mode)
+        
+        for start in range(0, len(resume_texts), batch_size):
+            chunk = resume_texts[start:start + batch_size]
+            for offset, resume_skills in enumerate(self.extractor.extract_skills_batch(chunk, mode=mode)):
+                yield start + offset, {**self._skill_score(resume_skills, jd_skills), "Extraction Mode": mode}
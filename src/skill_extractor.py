@@ -3,38 +3,111 @@ Advanced Hybrid Skill Extractor for ATS Resume Scoring
 Combines regex, fuzzy matching, and semantic similarity for 90%+ accuracy
 """
 
-from sentence_transformers import SentenceTransformer, util
-from rapidfuzz import fuzz
+from src.encoders import get_encoder
+from src.skill_matcher import SkillMatcher, FuzzySkillMatcher
+from src.embedding_cache import SkillEmbeddingCache, PhraseEmbeddingCache
+from src.cache import LRUCache, SqliteCache, TieredCache
+from src.metrics import timed, count
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+import numpy as np
 import re
 import json
+import hashlib
+import os
+import time
 from pathlib import Path
 
+# Stages per extraction mode: fast = regex/dictionary matcher, balanced adds
+# fuzzy matching, full adds SBERT semantic similarity
+EXTRACTION_MODES = ("fast", "balanced", "full")
+
+
+NUMERIC_PATTERN = re.compile(r'^\d+(?:\.\d+)?$')
+
+
+def _expired(deadline: float) -> bool:
+    return deadline is not None and time.perf_counter() >= deadline
+
 class HybridSkillExtractor:
-    def __init__(self):
+    # Bump whenever extraction logic changes so cached results are invalidated
+    EXTRACTOR_VERSION = 2
+    
+    def __init__(
+        self,
+        model_name: str = 'all-MiniLM-L6-v2',
+        cache_dir: str = None,
+        phrase_cache_size: int = 20000,
+        skill_cache_size: int = 4096,
+        skill_cache_path: str = None,
+        encoder_backend: str = None,
+        semantic_batch_size: int = 256,
+        max_semantic_candidates: int = 2000
+    ):
+        """
+        Args:
+            model_name: sentence-transformers model used for semantic matching
+            cache_dir: Where skill embeddings are persisted (defaults to ATS_CACHE_DIR or .cache/)
+            phrase_cache_size: Candidate phrase embeddings kept in memory
+            skill_cache_size: Extraction results kept in memory
+            skill_cache_path: Optional SQLite file for a persistent result cache
+            encoder_backend: "torch", "onnx" or "onnx-int8" (see src.encoders)
+            semantic_batch_size: Candidate phrases per SBERT encode call
+            max_semantic_candidates: Per-text cap on phrases reaching SBERT,
+                                     keeping the first ones in document order
+        """
         print("🔄 Initializing Hybrid Skill Extractor...")
         
-        # Load SBERT model for semantic matching
-        self.sbert = SentenceTransformer('all-MiniLM-L6-v2')
+        # Load SBERT model for semantic matching ("torch", "onnx" or "onnx-int8";
+        # defaults to ATS_ENCODER_BACKEND, see src.encoders)
+        self.model_name = model_name
+        self.sbert = get_encoder(model_name, encoder_backend)
         
         # Comprehensive skill database (expandable)
         self.skill_database = self._get_skill_database()
         
-        # Pre-compute embeddings for faster matching
-        print("📊 Pre-computing skill embeddings...")
-        self.skill_embeddings = self.sbert.encode(self.skill_database, convert_to_tensor=True)
-        
-        # Regex patterns for guaranteed matches
-        self.tech_patterns = [
-            r'\b(?:Python|Java|JavaScript|TypeScript|C\+\+|C#|Ruby|Go|Rust|PHP|Swift|Kotlin|Scala)\b',
-            r'\b(?:React(?:\.js)?|Vue(?:\.js)?|Angular|Next(?:\.js)?|Node(?:\.js)?|Express(?:\.js)?|Svelte)\b',
-            r'\b(?:AWS|Azure|GCP|Google Cloud|Docker|Kubernetes|K8s|Terraform|Ansible)\b',
-            r'\b(?:SQL|MySQL|PostgreSQL|MongoDB|Redis|Cassandra|DynamoDB|Oracle|NoSQL)\b',
-            r'\b(?:TensorFlow|PyTorch|Keras|Scikit-learn|XGBoost|LightGBM|Pandas|NumPy)\b',
-            r'\b(?:Flask|Django|FastAPI|Spring Boot|Rails|Laravel|ASP\.NET)\b',
-            r'\b(?:Git|GitHub|GitLab|Jenkins|CircleCI|Travis CI|GitHub Actions)\b',
-            r'\b(?:REST API|GraphQL|gRPC|WebSocket|Microservices|Serverless)\b',
+        # Normalized skill embeddings, memory-mapped from the on-disk cache
+        # (encoded only when the model or skill database changes)
+        self.skill_embeddings = SkillEmbeddingCache(cache_dir).load_or_build(
+            self.sbert, self.sbert.cache_name, self.skill_database
+        )
+        
+        # LRU cache of candidate phrase embeddings (n-grams repeat across documents)
+        self.phrase_embeddings = PhraseEmbeddingCache(self.sbert, maxsize=phrase_cache_size)
+        
+        # Tech aliases for guaranteed matches (alternation order matters:
+        # the first alias in a group that matches at a position wins)
+        self.tech_aliases = [
+            ["python", "java", "javascript", "typescript", "c++", "c#", "ruby", "go", "rust", "php", "swift", "kotlin", "scala"],
+            ["react.js", "react", "vue.js", "vue", "angular", "next.js", "next", "node.js", "node", "express.js", "express", "svelte"],
+            ["aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "k8s", "terraform", "ansible"],
+            ["sql", "mysql", "postgresql", "mongodb", "redis", "cassandra", "dynamodb", "oracle", "nosql"],
+            ["tensorflow", "pytorch", "keras", "scikit-learn", "xgboost", "lightgbm", "pandas", "numpy"],
+            ["flask", "django", "fastapi", "spring boot", "rails", "laravel", "asp.net"],
+            ["git", "github", "gitlab", "jenkins", "circleci", "travis ci", "github actions"],
+            ["rest api", "graphql", "grpc", "websocket", "microservices", "serverless"],
         ]
         
+        # Single-pass matcher over skills, aliases and acronyms
+        self.matcher = SkillMatcher(self.skill_database, self.tech_aliases)
+        
+        # Bulk fuzzy matcher for typos and variations (90% similarity)
+        self.fuzzy_matcher = FuzzySkillMatcher(self.skill_database, threshold=90)
+        
+        # Semantic stage limits; stopwords exclude words that occur in skills ("go", "system")
+        self.semantic_batch_size = semantic_batch_size
+        self.max_semantic_candidates = max_semantic_candidates
+        skill_words = {word for skill in self.skill_database for word in skill.split()}
+        self.semantic_stopwords = frozenset(ENGLISH_STOP_WORDS - skill_words)
+        
+        # Cache of extracted skills keyed by text hash + extractor configuration,
+        # with an optional SQLite tier (ATS_SKILL_CACHE_DB) that survives restarts
+        skill_cache_path = skill_cache_path or os.getenv("ATS_SKILL_CACHE_DB")
+        self.config_version = self._config_fingerprint()
+        self.skill_cache = TieredCache(
+            LRUCache(skill_cache_size),
+            SqliteCache(skill_cache_path) if skill_cache_path else None
+        )
+        
         print("✅ Hybrid Skill Extractor ready!")
     
     def _get_skill_database(self) -> list:
@@ -133,86 +206,256 @@ class HybridSkillExtractor:
         # Remove duplicates and sort
         return sorted(list(set(skill.lower() for skill in all_skills)))
     
-    def extract_skills(self, text: str, confidence_threshold: float = 0.70) -> list:
+    def _config_fingerprint(self) -> str:
+        """Hash of everything besides the text that affects extracted skills"""
+        config = {
+            "version": self.EXTRACTOR_VERSION,
+            "model": self.sbert.cache_name,
+            "skills": self.skill_database,
+            "aliases": self.tech_aliases,
+            "fuzzy_threshold": self.fuzzy_matcher.threshold,
+            "max_semantic_candidates": self.max_semantic_candidates,
+        }
+        return hashlib.sha256(json.dumps(config).encode("utf-8")).hexdigest()[:16]
+    
+    def _cache_key(self, text: str, confidence_threshold: float, mode: str = "full") -> str:
+        """Every stage works on lowercased text, so that is the normalized form"""
+        normalized = text.strip().lower()
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"skills:{self.config_version}:{mode}:{confidence_threshold}:{digest}"
+    
+    def _lexical_stage(self, text_lower: str, mode: str = "full", deadline: float = None) -> tuple:
+        """
+        Run Methods 1-3 (aliases, dictionary, fuzzy) on lowercased text.
+        Fuzzy matching is skipped in fast mode or once the deadline has passed.
+        
+        Returns:
+            (detected skills, 1-3 word n-gram candidates, whether every stage for mode ran)
+        """
+        detected_skills = set()
+        
+        # ===== Methods 1 & 2: Tech aliases and dictionary skills =====
+        # One pass with word boundaries; also covers the acronym scan since
+        # an uppercase acronym is just a dictionary skill in text_lower
+        with timed("skills.match"):
+            detected_skills.update(self.matcher.match(text_lower))
+        
+        if mode == "fast":
+            return detected_skills, [], True
+        if _expired(deadline):
+            return detected_skills, [], False
+        
+        # ===== Method 3: Fuzzy matching for typos and variations =====
+        # Extract potential skill phrases (1-3 word ngrams)
+        with timed("skills.ngrams"):
+            words = re.findall(r'\b\w+(?:\.\w+)?\b', text_lower)
+            candidates = []
+            
+            for i in range(len(words)):
+                # 1-word
+                candidates.append(words[i])
+                # 2-word
+                if i < len(words) - 1:
+                    candidates.append(f"{words[i]} {words[i+1]}")
+                # 3-word
+                if i < len(words) - 2:
+                    candidates.append(f"{words[i]} {words[i+1]} {words[i+2]}")
+        
+        # Score all candidates against the skill database in bulk
+        with timed("skills.fuzzy"):
+            detected_skills.update(self.fuzzy_matcher.match(candidates))
+        
+        return detected_skills, candidates, True
+    
+    def _is_filler(self, word: str) -> bool:
+        return word in self.semantic_stopwords or NUMERIC_PATTERN.match(word) is not None
+    
+    def _semantic_candidates(self, candidates: list, detected: set) -> list:
+        """
+        Meaningful phrases for the SBERT stage, deduplicated in document order.
+        
+        Drops phrases that start or end with a stopword or number (the core
+        phrase is its own candidate), and phrases already detected as skills.
+        At most max_semantic_candidates are kept.
+        
+        Returns:
+            List of candidate phrases
+        """
+        selected = []
+        # dict.fromkeys dedupes while keeping order
+        for phrase in dict.fromkeys(candidates):
+            if len(phrase) <= 2 or phrase in detected:
+                continue
+            words = phrase.split()
+            if self._is_filler(words[0]) or self._is_filler(words[-1]):
+                continue
+            selected.append(phrase)
+            if len(selected) == self.max_semantic_candidates:
+                count("skills.semantic_truncated")
+                break
+        return selected
+    
+    def _semantic_matches(self, candidate_embeddings: np.ndarray, confidence_threshold: float) -> np.ndarray:
+        """
+        Closest skill for each candidate embedding.
+        
+        Returns:
+            Skill database index per candidate, -1 where the best similarity is below the threshold
+        """
+        if len(candidate_embeddings) == 0:
+            return np.empty(0, dtype=np.intp)
+        
+        # Both sides are normalized, so the dot product is cosine similarity
+        similarities = candidate_embeddings @ self.skill_embeddings.T
+        best_match_idx = similarities.argmax(axis=1)
+        max_sim = similarities[np.arange(len(candidate_embeddings)), best_match_idx]
+        
+        return np.where(max_sim >= confidence_threshold, best_match_idx, -1)
+    
+    def extract_skills(
+        self,
+        text: str,
+        confidence_threshold: float = 0.70,
+        mode: str = "full",
+        time_budget_ms: float = None
+    ) -> list:
         """
         Extract skills using hybrid approach (regex + fuzzy + semantic).
         
         Args:
             text: Resume or job description text
             confidence_threshold: Minimum similarity score (0.0 to 1.0)
+            mode: "fast" (regex + dictionary), "balanced" (adds fuzzy) or "full" (adds SBERT)
+            time_budget_ms: Optional budget; stages that would start after it are skipped
         
         Returns:
             List of detected skills
         """
-        if not text or not text.strip():
-            return []
+        return self.extract_skills_detailed(text, confidence_threshold, mode, time_budget_ms)["skills"]
+    
+    def extract_skills_detailed(
+        self,
+        text: str,
+        confidence_threshold: float = 0.70,
+        mode: str = "full",
+        time_budget_ms: float = None
+    ) -> dict:
+        """
+        Same as extract_skills, but reports whether the time budget cut it short.
         
-        text_lower = text.lower()
-        detected_skills = set()
+        Returns:
+            {"skills": [...], "mode": mode, "partial": bool}
+        """
+        return self.extract_skills_batch_detailed([text], confidence_threshold, mode, time_budget_ms)[0]
+    
+    def extract_skills_batch(
+        self,
+        texts: list,
+        confidence_threshold: float = 0.70,
+        mode: str = "full",
+        time_budget_ms: float = None
+    ) -> list:
+        """
+        Extract skills from many texts, pooling the SBERT stage into one batch.
         
-        # ===== Method 1: Regex patterns for guaranteed matches =====
-        for pattern in self.tech_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Normalize the match
-                normalized = match.lower().replace('.js', '').strip()
-                detected_skills.add(normalized)
-        
-        # ===== Method 2: Direct database matching with word boundaries =====
-        for skill in self.skill_database:
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text_lower):
-                detected_skills.add(skill)
+        Texts already in the skill cache are returned without recomputation.
+        Candidate phrases from the rest go through the phrase embedding cache
+        together, so the model sees a single encode call for all cache misses.
         
-        # ===== Method 3: Fuzzy matching for typos and variations =====
-        # Extract potential skill phrases (1-3 word ngrams)
-        words = re.findall(r'\b\w+(?:\.\w+)?\b', text_lower)
-        candidates = []
-        
-        for i in range(len(words)):
-            # 1-word
-            candidates.append(words[i])
-            # 2-word
-            if i < len(words) - 1:
-                candidates.append(f"{words[i]} {words[i+1]}")
-            # 3-word
-            if i < len(words) - 2:
-                candidates.append(f"{words[i]} {words[i+1]} {words[i+2]}")
-        
-        # Check each candidate against skill database with fuzzy matching
-        for candidate in set(candidates):
-            for skill in self.skill_database:
-                similarity = fuzz.ratio(candidate, skill)
-                if similarity >= 90:  # 90% similarity threshold
-                    detected_skills.add(skill)
-                    break
-        
-        # ===== Method 4: Semantic similarity using SBERT =====
-        if candidates:
-            # Limit candidates to unique meaningful phrases
-            unique_candidates = list(set(c for c in candidates if len(c) > 2))[:100]
+        Args:
+            texts: Resume or job description texts
+            confidence_threshold: Minimum similarity score (0.0 to 1.0)
+            mode: "fast", "balanced" or "full" (see extract_skills)
+            time_budget_ms: Optional budget for the whole batch
+        
+        Returns:
+            List of detected skill lists, one per text
+        """
+        results = self.extract_skills_batch_detailed(texts, confidence_threshold, mode, time_budget_ms)
+        return [result["skills"] for result in results]
+    
+    def extract_skills_batch_detailed(
+        self,
+        texts: list,
+        confidence_threshold: float = 0.70,
+        mode: str = "full",
+        time_budget_ms: float = None
+    ) -> list:
+        """
+        Batch extraction reporting, per text, whether the time budget cut it short.
+        
+        The regex/dictionary matcher always runs. Fuzzy matching (per text)
+        and the remaining SBERT chunks are skipped once the budget is spent, and
+        the affected results are marked partial. Partial results are not cached.
+        
+        Returns:
+            List of {"skills": [...], "mode": mode, "partial": bool}, one per text
+        
+        Raises:
+            ValueError: If mode is not one of EXTRACTION_MODES
+        """
+        if mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode '{mode}', expected one of {EXTRACTION_MODES}")
+        deadline = time.perf_counter() + time_budget_ms / 1000 if time_budget_ms is not None else None
+        
+        results = [{"skills": [], "mode": mode, "partial": False} for _ in texts]
+        pending = []
+        
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            
+            key = self._cache_key(text, confidence_threshold, mode)
+            cached = self.skill_cache.get(key)
+            if cached is not None:
+                results[i]["skills"] = list(cached)
+                count("skills.cache_hit")
+            else:
+                pending.append((i, key, text))
+                count("skills.cache_miss")
+        
+        detected = []
+        complete = []
+        semantic_candidates = []
+        for _, _, text in pending:
+            skills, candidates, finished = self._lexical_stage(text.lower(), mode, deadline)
+            detected.append(skills)
+            complete.append(finished)
+            # Texts cut short before fuzzy matching don't get the semantic stage either
+            semantic_candidates.append(
+                self._semantic_candidates(candidates, skills) if mode == "full" and finished else []
+            )
+        
+        # ===== Method 4: Semantic similarity using SBERT (pooled, chunked) =====
+        # Fixed-size chunks bound the encode batch and similarity matrix sizes
+        pooled = [c for group in semantic_candidates for c in group]
+        owners = [n for n, group in enumerate(semantic_candidates) for _ in group]
+        batch_size = self.semantic_batch_size
+        for start in range(0, len(pooled), batch_size):
+            if _expired(deadline):
+                for n in set(owners[start:]):
+                    complete[n] = False
+                break
             
-            if unique_candidates:
-                candidate_embeddings = self.sbert.encode(unique_candidates, convert_to_tensor=True)
-                similarities = util.cos_sim(candidate_embeddings, self.skill_embeddings)
-                
-                for i, candidate in enumerate(unique_candidates):
-                    max_sim = similarities[i].max().item()
-                    if max_sim >= confidence_threshold:
-                        best_match_idx = similarities[i].argmax().item()
-                        matched_skill = self.skill_database[best_match_idx]
-                        detected_skills.add(matched_skill)
-        
-        # ===== Method 5: Extract common acronyms =====
-        acronyms = re.findall(r'\b[A-Z]{2,6}\b', text)
-        for acronym in acronyms:
-            acronym_lower = acronym.lower()
-            if acronym_lower in self.skill_database:
-                detected_skills.add(acronym_lower)
-        
-        # Clean and return
-        return sorted(list(detected_skills))
+            # Only phrases not seen before reach the model
+            with timed("skills.semantic_encode"):
+                embeddings = self.phrase_embeddings.encode(pooled[start:start + batch_size], batch_size)
+            with timed("skills.semantic_match"):
+                matches = self._semantic_matches(embeddings, confidence_threshold)
+                for n, idx in zip(owners[start:start + batch_size], matches):
+                    if idx >= 0:
+                        detected[n].add(self.skill_database[idx])
+        
+        # Clean, cache and return
+        for (i, key, _), skills, finished in zip(pending, detected, complete):
+            results[i]["skills"] = sorted(list(skills))
+            if finished:
+                self.skill_cache.set(key, list(results[i]["skills"]))
+            else:
+                results[i]["partial"] = True
+                count("skills.partial")
+        
+        return results
     
     def compute_ats_score(self, resume_text: str, jd_text: str) -> dict:
         """
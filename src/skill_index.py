@@ -0,0 +1,334 @@
+"""
+Inverted index from skills to stored resumes for top-k JD matching.
+Each skill gets a compact integer id and a sorted postings array of the
+resumes that have it, so a query only touches the postings of the JD's
+skills instead of rescanning every resume.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import os
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from src.embedding_cache import DEFAULT_CACHE_DIR
+from src.file_lock import file_lock
+
+DEFAULT_INDEX_PATH = DEFAULT_CACHE_DIR / "skill_index.npz"
+
+
+def _split(values: np.ndarray, offsets: np.ndarray) -> list:
+    """Inverse of concatenating arrays and recording their start offsets"""
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+class SkillIndex:
+    """
+    Resume skill sets stored as postings lists with incremental add/remove.
+
+    Resumes get internal ids in insertion order, so new postings are simply
+    appended (kept in small per-skill buffers until the next query). Removed
+    resumes are tombstoned; compaction drops them and renumbers the rest.
+    Scores use the same matched/JD-skill ratio as ResumeScorerPro.
+    Safe to share between FastAPI worker threads; worker processes sharing
+    one file should update it through transaction() and call refresh()
+    before queries.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, compact_ratio: float = 0.2, path: str = None):
+        """
+        Args:
+            compact_ratio: Rewrite postings once this fraction of resumes is removed
+            path: Backing .npz file (defaults to ATS_SKILL_INDEX or .cache/skill_index.npz)
+        """
+        self.compact_ratio = compact_ratio
+        self.path = Path(path or os.getenv("ATS_SKILL_INDEX", DEFAULT_INDEX_PATH))
+        self._file_version = None  # stat of the file this state was loaded from or saved to
+        self.skills = []          # skill id -> skill
+        self.skill_ids = {}       # skill -> skill id
+        self.doc_keys = []        # internal resume id -> external id ("" once removed)
+        self.doc_ids = {}         # external id -> internal resume id
+        self._doc_skills = []     # internal resume id -> sorted skill ids
+        self._postings = []       # skill id -> sorted int32 array of internal resume ids
+        self._pending = defaultdict(list)
+        self._deleted = bytearray()  # internal resume id -> 1 if removed
+        self._n_deleted = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self.doc_ids
+
+    # ------------------ Updates ------------------
+    def _skill_id(self, skill: str) -> int:
+        skill_id = self.skill_ids.get(skill)
+        if skill_id is None:
+            skill_id = len(self.skills)
+            self.skills.append(skill)
+            self.skill_ids[skill] = skill_id
+            self._postings.append(np.zeros(0, dtype=np.int32))
+        return skill_id
+
+    def add(self, resume_id: str, skills: list):
+        """Index a resume's extracted skills, replacing any earlier entry for resume_id"""
+        with self._lock:
+            if resume_id in self.doc_ids:
+                self.remove(resume_id)
+
+            doc = len(self.doc_keys)
+            skill_ids = sorted({self._skill_id(s) for s in skills})
+            for skill_id in skill_ids:
+                self._pending[skill_id].append(doc)
+
+            self.doc_keys.append(resume_id)
+            self.doc_ids[resume_id] = doc
+            self._doc_skills.append(np.array(skill_ids, dtype=np.int32))
+            self._deleted.append(0)
+
+    def add_many(self, items: list):
+        """Index (resume_id, skills) pairs"""
+        with self._lock:
+            for resume_id, skills in items:
+                self.add(resume_id, skills)
+
+    def remove(self, resume_id: str) -> bool:
+        """Tombstone a resume; returns False if it wasn't indexed"""
+        with self._lock:
+            doc = self.doc_ids.pop(resume_id, None)
+            if doc is None:
+                return False
+            self.doc_keys[doc] = ""
+            self._deleted[doc] = 1
+            self._n_deleted += 1
+            if self._n_deleted > self.compact_ratio * len(self.doc_keys):
+                self.compact()
+            return True
+
+    def _deleted_mask(self) -> np.ndarray:
+        return np.frombuffer(bytes(self._deleted), dtype=bool)
+
+    def _flush_pending(self):
+        # Internal ids only grow, so appending keeps every postings array sorted
+        for skill_id, docs in self._pending.items():
+            self._postings[skill_id] = np.concatenate(
+                [self._postings[skill_id], np.array(docs, dtype=np.int32)]
+            )
+        self._pending.clear()
+
+    def compact(self):
+        """Drop removed resumes and renumber the rest (insertion order is kept)"""
+        with self._lock:
+            self._flush_pending()
+            if self._n_deleted:
+                keep = ~self._deleted_mask()
+                # Old internal id -> new internal id, for kept resumes
+                new_ids = (np.cumsum(keep) - 1).astype(np.int32)
+                self._postings = [new_ids[p[keep[p]]] for p in self._postings]
+                self._doc_skills = [d for d, kept in zip(self._doc_skills, keep) if kept]
+                self.doc_keys = [key for key, kept in zip(self.doc_keys, keep) if kept]
+                self.doc_ids = {key: doc for doc, key in enumerate(self.doc_keys)}
+                self._deleted = bytearray(len(self.doc_keys))
+            self._n_deleted = 0
+
+    # ------------------ Queries ------------------
+    def resume_skills(self, resume_id: str) -> list:
+        with self._lock:
+            doc = self.doc_ids[resume_id]
+            return [self.skills[i] for i in self._doc_skills[doc]]
+
+    def top_k(self, jd_skills: list, k: int = 10) -> list:
+        """
+        Best matching resumes for a JD's skills.
+
+        Args:
+            jd_skills: Skills extracted from the job description
+            k: Number of resumes to return
+
+        Returns:
+            Up to k dicts with resume_id, "ATS Skill Score", "Matched Skills"
+            and "Missing Skills", best first (ties by insertion order).
+            Resumes matching no JD skill are not returned.
+        """
+        jd_skills = list(dict.fromkeys(jd_skills))
+        if not jd_skills or k <= 0:
+            return []
+
+        with self._lock:
+            self._flush_pending()
+            query_ids = [self.skill_ids[s] for s in jd_skills if s in self.skill_ids]
+            if not query_ids:
+                return []
+
+            hits = np.concatenate([self._postings[i] for i in query_ids])
+            counts = np.bincount(hits, minlength=len(self.doc_keys))
+            counts[self._deleted_mask()] = 0
+
+            k = min(k, int(np.count_nonzero(counts)))
+            if k == 0:
+                return []
+            # Unique ranking key: highest count first, then earliest indexed
+            n_docs = len(counts)
+            rank = counts.astype(np.int64) * n_docs + (n_docs - 1 - np.arange(n_docs))
+            top = np.argpartition(-rank, k - 1)[:k]
+            top = top[np.argsort(-rank[top])]
+
+            results = []
+            for doc in top:
+                resume_skill_ids = set(self._doc_skills[doc].tolist())
+                matched = [s for s in jd_skills if self.skill_ids.get(s) in resume_skill_ids]
+                results.append({
+                    "resume_id": self.doc_keys[doc],
+                    "ATS Skill Score": round(int(counts[doc]) / len(jd_skills) * 100, 2),
+                    "Matched Skills": matched,
+                    "Missing Skills": [s for s in jd_skills if s not in matched]
+                })
+            return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resumes": len(self.doc_ids),
+                "skills": len(self.skills),
+                "postings": int(sum(len(p) for p in self._postings)
+                                + sum(len(d) for d in self._pending.values())),
+                "removed_pending_compaction": self._n_deleted,
+            }
+
+    # ------------------ Persistence ------------------
+    @staticmethod
+    def _stat(path: Path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def refresh(self) -> bool:
+        """
+        Reload from self.path if another process saved it since this state was
+        loaded or saved. Cheap (one stat) when nothing changed.
+
+        Returns:
+            True if the index was reloaded
+        """
+        with self._lock:
+            if self._stat(self.path) in (None, self._file_version):
+                return False
+            self._reload()
+            return True
+
+    def _reload(self):
+        """Replace the in-memory state with the saved index, or an empty one if there is none"""
+        if self.path.exists():
+            fresh = self.load(self.path, self.compact_ratio)
+        else:
+            fresh = type(self)(self.compact_ratio, self.path)
+        lock = self._lock
+        self.__dict__.update(fresh.__dict__)
+        self._lock = lock
+
+    @contextmanager
+    def transaction(self):
+        """
+        Apply updates on top of the latest saved index and save them, holding
+        a file lock so concurrent worker processes never overwrite each other.
+        If the body (or the save) raises, its changes are discarded by
+        reloading the saved index.
+
+        Usage:
+            with index.transaction():
+                index.add_many(items)
+        """
+        with self._lock, file_lock(self.path):
+            self.refresh()
+            try:
+                yield self
+                self.save()
+            except BaseException:
+                self._reload()
+                raise
+
+    def save(self, path: str = None):
+        """Compact and write the index as .npz atomically"""
+        path = Path(path) if path else self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            self.compact()
+            lengths = np.array([len(p) for p in self._postings], dtype=np.int64)
+            doc_lengths = np.array([len(d) for d in self._doc_skills], dtype=np.int64)
+            arrays = {
+                "format": self.FORMAT_VERSION,
+                "skills": np.array(self.skills, dtype=str),
+                "doc_keys": np.array(self.doc_keys, dtype=str),
+                "deleted": self._deleted_mask(),
+                "posting_offsets": np.concatenate([[0], np.cumsum(lengths)]),
+                "postings": np.concatenate(self._postings) if self._postings else np.zeros(0, dtype=np.int32),
+                "doc_offsets": np.concatenate([[0], np.cumsum(doc_lengths)]),
+                "doc_skills": np.concatenate(self._doc_skills) if self._doc_skills else np.zeros(0, dtype=np.int32),
+            }
+
+            with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".npz.tmp", delete=False) as tmp:
+                np.savez(tmp, **arrays)
+            os.replace(tmp.name, path)
+            if path == self.path:
+                self._file_version = self._stat(path)
+
+    @classmethod
+    def load(cls, path: str = None, compact_ratio: float = 0.2) -> "SkillIndex":
+        """
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If it was written by an incompatible version
+        """
+        index = cls(compact_ratio, path)
+        path = index.path
+        # Stat before reading: a save racing with this load at worst causes one extra reload
+        index._file_version = cls._stat(path)
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format"]) != cls.FORMAT_VERSION:
+                raise ValueError(f"Unsupported skill index format in {path}")
+
+            index.skills = data["skills"].tolist()
+            index.skill_ids = {skill: i for i, skill in enumerate(index.skills)}
+            index.doc_keys = data["doc_keys"].tolist()
+            index._deleted = bytearray(data["deleted"].astype(np.uint8).tobytes())
+            index.doc_ids = {
+                key: doc for doc, key in enumerate(index.doc_keys) if not index._deleted[doc]
+            }
+            index._postings = _split(data["postings"].astype(np.int32), data["posting_offsets"])
+            index._doc_skills = _split(data["doc_skills"].astype(np.int32), data["doc_offsets"])
+        # Files from before compaction renumbered ids may still hold tombstones
+        index._n_deleted = sum(index._deleted)
+        index.compact()
+        return index
+
+    @classmethod
+    def load_or_create(cls, path: str = None) -> "SkillIndex":
+        """
+        Load the index from disk, or start an empty one if there is none yet.
+
+        An index file that exists but can't be used is never replaced, since
+        the next save would overwrite it (move it aside to start over).
+
+        Raises:
+            OSError: If the saved index can't be read
+            ValueError: If it is corrupt or was written by an incompatible version
+        """
+        index = cls(path=path)
+        if not index.path.exists():
+            return index
+        try:
+            return cls.load(index.path)
+        except OSError as e:
+            raise OSError(f"Refusing to replace the skill index {index.path}: {e}") from e
+        except (ValueError, KeyError, zipfile.BadZipFile) as e:
+            raise ValueError(f"Refusing to replace the skill index {index.path}: {e}") from e
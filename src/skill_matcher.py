@@ -0,0 +1,158 @@
+"""
+Compiled skill dictionary matcher for the Hybrid Skill Extractor.
+Finds dictionary skills, tech aliases and acronyms in one pass over the text,
+and fuzzy-matches n-gram candidates against the dictionary in bulk.
+"""
+
+from collections import defaultdict
+import re
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+_WORD_BOUNDARY = re.compile(r'\b')
+
+# Sentinel key marking the end of a phrase in the trie
+_END = ""
+
+
+class SkillMatcher:
+    """
+    Character trie over every dictionary skill and tech alias, matched with
+    the same word-boundary rules as the old per-skill ``\\b...\\b`` regexes.
+
+    Dictionary skills may overlap each other freely (every skill is searched
+    independently). Alias groups keep regex alternation semantics instead:
+    within a group the first listed alias that matches at a position wins and
+    matches of the same group never overlap, exactly like ``re.findall``.
+    """
+
+    def __init__(self, skill_database: list, alias_groups: list):
+        """
+        Args:
+            skill_database: Lowercase skill phrases
+            alias_groups: Lists of lowercase aliases, in alternation order
+        """
+        self._trie = {}
+        self._num_groups = len(alias_groups)
+
+        for skill in skill_database:
+            self._insert(skill, (-1, 0, skill))
+
+        for group_id, aliases in enumerate(alias_groups):
+            for priority, alias in enumerate(aliases):
+                normalized = alias.replace('.js', '').strip()
+                self._insert(alias, (group_id, priority, normalized))
+
+    def _insert(self, phrase: str, payload: tuple):
+        node = self._trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node.setdefault(_END, []).append(payload)
+
+    def match(self, text_lower: str) -> set:
+        """
+        Find every skill and alias in already-lowercased text.
+
+        Args:
+            text_lower: Lowercased resume or job description text
+
+        Returns:
+            Set of normalized skills
+        """
+        found = set()
+        if not text_lower:
+            return found
+
+        boundaries = {m.start() for m in _WORD_BOUNDARY.finditer(text_lower)}
+        group_ends = [0] * self._num_groups
+        trie = self._trie
+        length = len(text_lower)
+
+        for start in sorted(boundaries):
+            node = trie.get(text_lower[start]) if start < length else None
+            if node is None:
+                continue
+
+            # Best (lowest priority) alias hit per group at this start
+            group_hits = {}
+            pos = start + 1
+            while node is not None:
+                if _END in node and pos in boundaries:
+                    for group_id, priority, skill in node[_END]:
+                        if group_id < 0:
+                            found.add(skill)
+                        elif group_id not in group_hits or priority < group_hits[group_id][0]:
+                            group_hits[group_id] = (priority, pos, skill)
+                if pos >= length:
+                    break
+                node = node.get(text_lower[pos])
+                pos += 1
+
+            for group_id, (_, end, skill) in group_hits.items():
+                if start >= group_ends[group_id]:
+                    found.add(skill)
+                    group_ends[group_id] = end
+
+        return found
+
+
+class FuzzySkillMatcher:
+    """
+    Bulk fuzzy matcher built on ``rapidfuzz.process.cdist``.
+
+    ``fuzz.ratio(a, b) >= threshold`` is impossible when the lengths differ by
+    more than ``(100 - threshold)%`` of ``len(a) + len(b)``, so candidates are
+    bucketed by length and only scored against skills of compatible length.
+    For each candidate the first matching skill in database order is kept,
+    same as the old nested loop.
+    """
+
+    def __init__(self, skill_database: list, threshold: float = 90):
+        """
+        Args:
+            skill_database: Lowercase skill phrases
+            threshold: Minimum ``fuzz.ratio`` score (0 to 100)
+        """
+        self.skill_database = skill_database
+        self.threshold = threshold
+        self._skill_lengths = np.array([len(skill) for skill in skill_database])
+        self._choices_by_length = {}
+
+    def _choices_for_length(self, length: int) -> list:
+        """Skills (in database order) that could reach the threshold for this length"""
+        choices = self._choices_by_length.get(length)
+        if choices is None:
+            lengths = self._skill_lengths
+            compatible = np.abs(lengths - length) * 100 <= (100 - self.threshold) * (lengths + length)
+            choices = [self.skill_database[i] for i in np.flatnonzero(compatible)]
+            self._choices_by_length[length] = choices
+        return choices
+
+    def match(self, candidates) -> set:
+        """
+        Fuzzy-match candidate phrases against the skill database.
+
+        Args:
+            candidates: Iterable of lowercase candidate phrases
+
+        Returns:
+            Set of matched skills
+        """
+        buckets = defaultdict(list)
+        for candidate in set(candidates):
+            buckets[len(candidate)].append(candidate)
+
+        found = set()
+        for length, group in buckets.items():
+            choices = self._choices_for_length(length)
+            if not choices:
+                continue
+
+            scores = process.cdist(group, choices, scorer=fuzz.ratio, score_cutoff=self.threshold)
+            hits = scores >= self.threshold
+            rows = np.flatnonzero(hits.any(axis=1))
+            for col in hits[rows].argmax(axis=1):
+                found.add(choices[col])
+
+        return found
@@ -0,0 +1,539 @@
+"""
+Local vector store for semantic resume retrieval.
+Normalized resume embeddings live in one contiguous memory-mapped array
+(float32, or int8 with a per-row scale), searched exactly in blocks with
+NumPy or approximately through an optional inverted-file (IVF) index.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from src.embedding_cache import DEFAULT_CACHE_DIR
+from src.file_lock import file_lock
+
+DEFAULT_STORE_DIR = DEFAULT_CACHE_DIR / "vector_store"
+
+
+def encode_documents(model, texts: list, chunk_chars: int = 1000, batch_size: int = 64) -> np.ndarray:
+    """
+    Embed long documents with a sentence-transformers model.
+
+    The model only reads the first few hundred tokens of an input, so each
+    text is split into chunks that are encoded together in one batched call;
+    a document's embedding is the normalized mean of its chunk embeddings.
+
+    Returns:
+        float32 array of shape (len(texts), dim) with unit-length rows
+    """
+    chunks = []
+    owners = []
+    for i, text in enumerate(texts):
+        pieces = [text[j:j + chunk_chars] for j in range(0, len(text), chunk_chars)] or [""]
+        chunks.extend(pieces)
+        owners.extend([i] * len(pieces))
+
+    chunk_embeddings = model.encode(
+        chunks, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True
+    ).astype(np.float32)
+
+    embeddings = np.zeros((len(texts), chunk_embeddings.shape[1]), dtype=np.float32)
+    np.add.at(embeddings, np.array(owners), chunk_embeddings)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+class VectorStore:
+    """
+    Append-only embedding matrix with incremental add/remove and top-k search.
+
+    Rows are stored in a memory-mapped .npy file that grows by doubling, so
+    startup only maps the file instead of reading it. Removed rows are
+    tombstoned and skipped at query time; save() compacts them away once
+    they pass compact_ratio of the rows. Safe to share between FastAPI
+    worker threads; worker processes sharing one directory should update it
+    through transaction() and call refresh() before queries.
+    """
+
+    FORMAT_VERSION = 1
+    DTYPES = ("float32", "int8")
+
+    def __init__(
+        self,
+        dim: int,
+        path: str = None,
+        dtype: str = "float32",
+        model_name: str = None,
+        block_size: int = 8192,
+        compact_ratio: float = 0.2
+    ):
+        """
+        Args:
+            dim: Embedding dimension
+            path: Directory for the store files (defaults to ATS_VECTOR_STORE
+                  or .cache/vector_store); existing files are not read, use load()
+            dtype: "float32", or "int8" to quantize rows (4x smaller)
+            model_name: Embedding model, checked on load so vectors never mix models
+            block_size: Rows scored per NumPy block during exact search
+            compact_ratio: Rewrite the rows on save once this fraction is removed
+        """
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unknown vector dtype '{dtype}', choose from {self.DTYPES}")
+        self.dim = dim
+        self.path = Path(path or os.getenv("ATS_VECTOR_STORE", DEFAULT_STORE_DIR))
+        self.dtype = dtype
+        self.model_name = model_name
+        self.block_size = block_size
+        self.compact_ratio = compact_ratio
+
+        self.ids = []             # row -> resume id ("" once removed)
+        self.rows = {}            # resume id -> row
+        self._vectors = None      # memmap of shape (capacity, dim)
+        self._vectors_file = "vectors.npy"
+        self._rows_file = "rows.npz"
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._deleted = bytearray()
+        self._n_deleted = 0
+
+        # Optional IVF index: centroids plus the list each row belongs to
+        self._centroids = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists = None        # (rows sorted by list, list offsets), rebuilt lazily
+        self._file_version = None # stat of the meta.json this state was loaded from or saved to
+        self._lock = threading.RLock()
+        self._in_transaction = False  # this process already holds the file lock
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self.rows
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / self._vectors_file
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.path / "meta.json"
+
+    # ------------------ Storage ------------------
+    def _ensure_capacity(self, n_rows: int):
+        """Grow the memory-mapped array (doubling) so it holds at least n_rows"""
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if n_rows <= capacity:
+            return
+
+        new_capacity = max(1024, capacity * 2, n_rows)
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = tempfile.NamedTemporaryFile(dir=self.path, suffix=".npy.tmp", delete=False)
+        tmp.close()
+        grown = np.lib.format.open_memmap(tmp.name, mode="w+", dtype=self.dtype, shape=(new_capacity, self.dim))
+        if capacity:
+            grown[:len(self.ids)] = self._vectors[:len(self.ids)]
+            grown.flush()
+        del grown
+        os.replace(tmp.name, self._vectors_path)
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+
+    def _quantize(self, embeddings: np.ndarray) -> tuple:
+        """Rows to store plus their dequantization scales"""
+        if self.dtype == "float32":
+            return embeddings, np.ones(len(embeddings), dtype=np.float32)
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales = np.maximum(scales, 1e-12).astype(np.float32)
+        return np.round(embeddings / scales[:, None]).astype(np.int8), scales
+
+    # ------------------ Updates ------------------
+    def add(self, resume_ids: list, embeddings: np.ndarray):
+        """
+        Store normalized embeddings, replacing earlier rows for the same ids.
+
+        Args:
+            resume_ids: One id per row
+            embeddings: float32 array of shape (len(resume_ids), dim)
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape != (len(resume_ids), self.dim):
+            raise ValueError(f"Expected embeddings of shape ({len(resume_ids)}, {self.dim}), got {embeddings.shape}")
+
+        with self._lock:
+            for resume_id in resume_ids:
+                self.remove(resume_id)
+
+            start = len(self.ids)
+            end = start + len(resume_ids)
+            self._ensure_capacity(end)
+
+            stored, scales = self._quantize(embeddings)
+            self._vectors[start:end] = stored
+            self._scales = np.concatenate([self._scales, scales])
+            self._deleted.extend(bytes(len(resume_ids)))
+            for row, resume_id in enumerate(resume_ids, start):
+                self.ids.append(resume_id)
+                self.rows[resume_id] = row
+
+            if self._centroids is not None:
+                self._assignments = np.concatenate([self._assignments, self._assign(embeddings)])
+                self._lists = None
+
+    def remove(self, resume_id: str) -> bool:
+        """Tombstone a resume's row; returns False if it wasn't stored"""
+        with self._lock:
+            row = self.rows.pop(resume_id, None)
+            if row is None:
+                return False
+            self.ids[row] = ""
+            self._deleted[row] = 1
+            self._n_deleted += 1
+            return True
+
+    def compact(self):
+        """
+        Drop removed rows and renumber the rest (insertion order is kept).
+
+        The kept rows are copied into a new vectors file; the old one stays
+        in place until the next save() commits the new one, so other workers
+        and a rolled back transaction still find the rows meta.json points to.
+        """
+        with self._lock:
+            if not self._n_deleted:
+                return
+            keep = np.flatnonzero(~np.frombuffer(bytes(self._deleted), dtype=bool))
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp = tempfile.NamedTemporaryFile(dir=self.path, prefix="vectors-", suffix=".npy", delete=False)
+            tmp.close()
+            compacted = np.lib.format.open_memmap(
+                tmp.name, mode="w+", dtype=self.dtype, shape=(max(1024, len(keep)), self.dim)
+            )
+            for start in range(0, len(keep), self.block_size):
+                block = keep[start:start + self.block_size]
+                compacted[start:start + len(block)] = self._vectors[block]
+            compacted.flush()
+            del compacted
+            self._vectors_file = Path(tmp.name).name
+            self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+
+            self._scales = self._scales[keep]
+            if self._centroids is not None:
+                self._assignments = self._assignments[keep]
+                self._lists = None
+            self.ids = [self.ids[row] for row in keep]
+            self.rows = {resume_id: row for row, resume_id in enumerate(self.ids)}
+            self._deleted = bytearray(len(self.ids))
+            self._n_deleted = 0
+
+    # ------------------ Search ------------------
+    def _block_scores(self, start: int, end: int, query: np.ndarray) -> np.ndarray:
+        block = self._vectors[start:end]
+        if self.dtype == "float32":
+            return block @ query
+        return (block.astype(np.float32) @ query) * self._scales[start:end]
+
+    def _top_k(self, rows: np.ndarray, scores: np.ndarray, k: int) -> tuple:
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def search(self, query: np.ndarray, k: int = 10, n_probe: int = None) -> list:
+        """
+        Most similar stored resumes for a normalized query embedding.
+
+        Scans every row in blocks of block_size unless an IVF index has been
+        built and n_probe is given, in which case only the rows in the
+        n_probe closest lists (at least one) are scored.
+
+        Returns:
+            Up to k dicts with resume_id and similarity (cosine), best first
+        """
+        query = np.asarray(query, dtype=np.float32).ravel()
+        if k <= 0:
+            return []
+
+        with self._lock:
+            n_rows = len(self.ids)
+            if not n_rows:
+                return []
+            deleted = np.frombuffer(bytes(self._deleted), dtype=bool)
+
+            if n_probe is not None and self._centroids is not None:
+                probe = np.argsort(-(self._centroids @ query))[:max(1, n_probe)]
+                rows_by_list, offsets = self._inverted_lists()
+                candidates = np.sort(np.concatenate([rows_by_list[offsets[i]:offsets[i + 1]] for i in probe]))
+                candidates = candidates[~deleted[candidates]]
+                vectors = self._vectors[candidates]
+                if self.dtype == "float32":
+                    scores = vectors @ query
+                else:
+                    scores = (vectors.astype(np.float32) @ query) * self._scales[candidates]
+                best_rows, best_scores = self._top_k(candidates, scores, k)
+            else:
+                best_rows = np.zeros(0, dtype=np.int64)
+                best_scores = np.zeros(0, dtype=np.float32)
+                for start in range(0, n_rows, self.block_size):
+                    end = min(start + self.block_size, n_rows)
+                    scores = self._block_scores(start, end, query)
+                    scores[deleted[start:end]] = -np.inf
+                    rows, scores = self._top_k(np.arange(start, end), scores, k)
+                    best_rows, best_scores = self._top_k(
+                        np.concatenate([best_rows, rows]), np.concatenate([best_scores, scores]), k
+                    )
+
+            # int8 rounding can push dequantized scores slightly past +/-1
+            return [
+                {"resume_id": self.ids[row], "similarity": round(min(max(float(score), -1.0), 1.0), 4)}
+                for row, score in zip(best_rows, best_scores)
+                if np.isfinite(score)
+            ]
+
+    # ------------------ Approximate index ------------------
+    def _assign(self, embeddings: np.ndarray) -> np.ndarray:
+        return np.argmax(embeddings @ self._centroids.T, axis=1).astype(np.int32)
+
+    def build_ivf(self, n_lists: int = None, n_iter: int = 10, sample_size: int = 50000, seed: int = 0):
+        """
+        Cluster stored rows with spherical k-means for approximate search.
+
+        Args:
+            n_lists: Number of clusters (defaults to ~sqrt of the row count)
+            n_iter: k-means iterations
+            sample_size: Rows sampled to train the centroids
+            seed: Random seed for sampling and initialization
+        """
+        with self._lock:
+            n_rows = len(self.ids)
+            if not n_rows:
+                return
+            n_lists = min(max(1, n_lists or int(np.sqrt(n_rows))), n_rows)
+            rng = np.random.default_rng(seed)
+
+            sample = np.sort(rng.choice(n_rows, size=min(sample_size, n_rows), replace=False))
+            train = self._dequantize(sample)
+            centroids = train[rng.choice(len(train), size=n_lists, replace=False)]
+            for _ in range(n_iter):
+                labels = np.argmax(train @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, train)
+                empty = ~np.bincount(labels, minlength=n_lists).astype(bool)
+                sums[empty] = centroids[empty]
+                centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+            self._centroids = centroids.astype(np.float32)
+            self._lists = None
+            self._assignments = np.concatenate([
+                self._assign(self._dequantize(np.arange(start, min(start + self.block_size, n_rows))))
+                for start in range(0, n_rows, self.block_size)
+            ])
+
+    def _inverted_lists(self) -> tuple:
+        """Rows grouped by IVF list, plus each list's start offset"""
+        if self._lists is None:
+            rows_by_list = np.argsort(self._assignments, kind="stable")
+            counts = np.bincount(self._assignments, minlength=len(self._centroids))
+            self._lists = (rows_by_list, np.concatenate([[0], np.cumsum(counts)]))
+        return self._lists
+
+    def _dequantize(self, rows: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self.dtype == "int8":
+            vectors *= self._scales[rows][:, None]
+        return vectors
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "resumes": len(self.rows),
+                "rows": len(self.ids),
+                "removed_pending_compaction": self._n_deleted,
+                "dim": self.dim,
+                "dtype": self.dtype,
+                "model": self.model_name,
+                "ivf_lists": 0 if self._centroids is None else len(self._centroids),
+            }
+
+    # ------------------ Persistence ------------------
+    @staticmethod
+    def _stat(path: Path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def refresh(self) -> bool:
+        """
+        Reload from self.path if another process saved it since this state was
+        loaded or saved. Cheap (one stat) when nothing changed; a reload holds
+        the file lock so it never mixes files from two saves.
+
+        Returns:
+            True if the store was reloaded
+        """
+        with self._lock:
+            if self._stat(self._meta_path) in (None, self._file_version):
+                return False
+            if self._in_transaction:
+                self._reload()
+            else:
+                with file_lock(self._meta_path):
+                    self._reload()
+            return True
+
+    def _reload(self):
+        """Replace the in-memory state with the saved store, or an empty one if there is none"""
+        if self._meta_path.exists():
+            fresh = self.load(self.path, self.model_name, self.block_size, self.compact_ratio)
+        else:
+            fresh = type(self)(self.dim, self.path, self.dtype, self.model_name, self.block_size, self.compact_ratio)
+        lock, in_transaction = self._lock, self._in_transaction
+        self.__dict__.update(fresh.__dict__)
+        self._lock, self._in_transaction = lock, in_transaction
+
+    @contextmanager
+    def transaction(self):
+        """
+        Apply updates on top of the latest saved store and save them, holding
+        a file lock so only one worker process writes the files at a time.
+
+        Rows are append-only and a grown vectors file replaces the old one, so
+        other workers keep searching a consistent snapshot until they refresh.
+        If the body (or the save) raises, its changes are discarded by
+        reloading the saved store.
+
+        Usage:
+            with store.transaction():
+                store.add(ids, embeddings)
+        """
+        with self._lock, file_lock(self._meta_path):
+            self._in_transaction = True
+            try:
+                self.refresh()
+                yield self
+                self.save()
+            except BaseException:
+                self._reload()
+                raise
+            finally:
+                self._in_transaction = False
+
+    def save(self):
+        """
+        Flush the vectors and write ids, scales and the IVF index, compacting
+        first if enough rows have been removed.
+
+        Scales and the IVF index go to a new rows file; replacing meta.json,
+        which names the current rows and vectors files, commits the save, and
+        only then are superseded files deleted.
+        """
+        with self._lock:
+            if self._n_deleted > self.compact_ratio * len(self.ids):
+                self.compact()
+            self.path.mkdir(parents=True, exist_ok=True)
+            if self._vectors is not None:
+                self._vectors.flush()
+
+            arrays = {
+                "scales": self._scales,
+                "deleted": np.frombuffer(bytes(self._deleted), dtype=bool),
+                "assignments": self._assignments,
+            }
+            if self._centroids is not None:
+                arrays["centroids"] = self._centroids
+            with tempfile.NamedTemporaryFile(dir=self.path, prefix="rows-", suffix=".npz", delete=False) as tmp:
+                np.savez(tmp, **arrays)
+            rows_file = Path(tmp.name).name
+
+            meta = {
+                "format": self.FORMAT_VERSION,
+                "dim": self.dim,
+                "dtype": self.dtype,
+                "model": self.model_name,
+                "vectors": self._vectors_file,
+                "rows": rows_file,
+                "ids": self.ids,
+            }
+            with tempfile.NamedTemporaryFile("w", dir=self.path, suffix=".json.tmp", delete=False, encoding="utf-8") as tmp:
+                json.dump(meta, tmp)
+            os.replace(tmp.name, self._meta_path)
+            self._file_version = self._stat(self._meta_path)
+            self._rows_file = rows_file
+
+            for stale in [*self.path.glob("vectors*.npy"), *self.path.glob("rows*.npz")]:
+                if stale.name not in (self._vectors_file, self._rows_file):
+                    try:
+                        stale.unlink()
+                    except OSError:
+                        pass  # Still mapped on Windows; a later save retries
+
+    @classmethod
+    def load(
+        cls, path: str = None, model_name: str = None, block_size: int = 8192, compact_ratio: float = 0.2
+    ) -> "VectorStore":
+        """
+        Memory-map a saved store.
+
+        Raises:
+            OSError: If the files can't be read
+            ValueError: If the store is from another format version or model
+        """
+        path = Path(path or os.getenv("ATS_VECTOR_STORE", DEFAULT_STORE_DIR))
+        # Stat before reading: a save racing with this load at worst causes one extra reload
+        file_version = cls._stat(path / "meta.json")
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector store format in {path}")
+        if model_name and meta.get("model") != model_name:
+            raise ValueError(f"Vector store in {path} was built with {meta.get('model')}, not {model_name}")
+
+        store = cls(meta["dim"], path, meta["dtype"], meta["model"], block_size, compact_ratio)
+        store._file_version = file_version
+        store.ids = meta["ids"]
+        store._vectors_file = meta.get("vectors", store._vectors_file)
+        store._rows_file = meta.get("rows", store._rows_file)
+        if store.ids:
+            store._vectors = np.load(store._vectors_path, mmap_mode="r+")
+
+        with np.load(path / store._rows_file, allow_pickle=False) as data:
+            store._scales = data["scales"]
+            store._deleted = bytearray(data["deleted"].astype(np.uint8).tobytes())
+            store._n_deleted = sum(store._deleted)
+            store._assignments = data["assignments"]
+            if "centroids" in data:
+                store._centroids = data["centroids"]
+
+        store.rows = {
+            resume_id: row for row, resume_id in enumerate(store.ids) if not store._deleted[row]
+        }
+        return store
+
+    @classmethod
+    def load_or_create(cls, dim: int, path: str = None, dtype: str = "float32", model_name: str = None) -> "VectorStore":
+        """
+        Load the store from disk, or start an empty one if there is none yet.
+
+        A store that exists but can't be used is never replaced, since the
+        next save would overwrite its vectors.
+
+        Raises:
+            OSError: If the saved store can't be read
+            ValueError: If it was built with another format version or model
+                        (point ATS_VECTOR_STORE at a separate directory per model)
+        """
+        store = cls(dim, path, dtype, model_name)
+        if not store._meta_path.exists():
+            return store
+        try:
+            with file_lock(store._meta_path):
+                return cls.load(store.path, model_name)
+        except OSError as e:
+            raise OSError(f"Refusing to replace the vector store in {store.path}: {e}") from e
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"Refusing to replace the vector store in {store.path}: {e}") from e